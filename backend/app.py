@@ -1,5 +1,14 @@
+import os
 from app import create_app
 
+# Servidor de desarrollo de Flask (un solo proceso)
+# Para producción usar: gunicorn -c gunicorn.conf.py wsgi:app
 if __name__ == '__main__':
     app = create_app()
-    app.run(host="0.0.0.0", port=5000, debug=True)
\ No newline at end of file
+    debug = app.config['DEBUG']
+    app.run(
+        host=os.getenv('HOST', '0.0.0.0'),
+        port=int(os.getenv('PORT', 5000)),
+        debug=debug,
+        use_reloader=debug
+    )
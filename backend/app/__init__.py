@@ -1,18 +1,33 @@
+import click
 from flask import Flask
 from flask_cors import CORS
+from app.compresion import registrar_compresion
 from app.config import Config
 from app.database import db
-from app.extensions import jwt
+from app.extensions import jwt, iniciar_migraciones
+from app.json_provider import ProveedorJSON
+from app.metricas import registrar_metricas
+from app.pool import configurar_pool
+from app.presupuesto_consultas import registrar_presupuesto_consultas
 
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
     
+    # JSON de las respuestas: orjson si está instalado, fechas en ISO 8601
+    app.json = ProveedorJSON(app)
+    
     # Inicializar extensiones
+    configurar_pool(app)
     db.init_app(app)
     jwt.init_app(app)
     
+    # Migraciones: solo desde la consola ("flask db ...") o si se pide migrar al arrancar
+    # Bajo gunicorn no se carga Alembic ni se toca la BD al crear la app
+    if click.get_current_context(silent=True) or app.config['MIGRAR_AL_ARRANCAR']:
+        iniciar_migraciones(app, db)
+    
     # Configurar CORS para permitir el frontend en puerto diferente
     CORS(app, 
          origins=["http://localhost:4321", "http://127.0.0.1:4321"],
@@ -21,6 +36,15 @@ def create_app():
          expose_headers=["Content-Type", "Authorization"],
          supports_credentials=True)
     
+    # Métricas por endpoint (latencia, códigos de respuesta, consultas SQL) en /metrics
+    registrar_metricas(app)
+    
+    # Control de consultas por request (solo si PRESUPUESTO_CONSULTAS_ACTIVO)
+    registrar_presupuesto_consultas(app)
+    
+    # Comprimir las respuestas JSON / CSV grandes (gzip o brotli, según el cliente)
+    registrar_compresion(app)
+    
     # Registrar blueprints
     from app.auth.routes import auth_bp
     from app.business.routes import business_bp
@@ -34,8 +58,20 @@ def create_app():
     app.register_blueprint(appointments_bp)
     app.register_blueprint(management_bp)
     
-    # Crear tablas
-    with app.app_context():
-        db.create_all()
+    # Comandos de consola (flask turnos ...)
+    from app.appointments.cli import turnos_cli
+    app.cli.add_command(turnos_cli)
+    
+    # Datos de ejemplo para pruebas de carga (flask seed)
+    from app.seed import seed_cli
+    app.cli.add_command(seed_cli)
+    
+    # El esquema no se crea al arrancar: se aplica con "flask db upgrade"
+    # (o con DB_MIGRAR_AL_ARRANCAR=1, pensado para gunicorn con preload_app)
+    if app.config['MIGRAR_AL_ARRANCAR']:
+        from flask_migrate import upgrade
+        
+        with app.app_context():
+            upgrade()
     
     return app
\ No newline at end of file
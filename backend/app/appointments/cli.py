@@ -0,0 +1,153 @@
+import time
+import click
+from flask.cli import AppGroup
+from sqlalchemy import func, select, text
+from datetime import date, timedelta
+from app.appointments.models import Turno
+from app.appointments.service import TurnoService
+from app.database import db
+
+# Grupo de comandos "flask turnos ..."
+turnos_cli = AppGroup('turnos', help='Comandos de mantenimiento de turnos.')
+
+
+# Consultas frecuentes sobre turnos y los índices que puede usar cada una
+# (en MySQL la disponibilidad usa el índice compuesto en vez del parcial)
+def _consultas_frecuentes():
+    hoy = date.today()
+
+    return [
+        (
+            'horarios disponibles de una fecha',
+            select(Turno.hora).where(Turno.fecha == hoy, Turno.estado == 'reservado'),
+            ('uq_turnos_reservados_fecha_hora', 'ix_turnos_reservados_fecha_hora'),
+        ),
+        (
+            'disponibilidad de un rango',
+            select(Turno.fecha, Turno.hora).where(
+                Turno.fecha >= hoy,
+                Turno.fecha <= hoy + timedelta(days=60),
+                Turno.estado == 'reservado'
+            ),
+            ('uq_turnos_reservados_fecha_hora', 'ix_turnos_reservados_fecha_hora'),
+        ),
+        (
+            'turno activo de un cliente',
+            select(Turno.id).where(Turno.client_id == 'cliente', Turno.estado == 'reservado'),
+            ('uq_turnos_reservados_client', 'ix_turnos_reservados_client'),
+        ),
+        (
+            'turnos de un rango (admin)',
+            select(Turno.id).where(
+                Turno.fecha >= hoy,
+                Turno.fecha <= hoy + timedelta(days=30),
+                Turno.estado == 'completado'
+            ).order_by(Turno.fecha, Turno.hora),
+            ('ix_turnos_fecha_hora',),
+        ),
+    ]
+
+
+# Obtener el plan de ejecución (EXPLAIN) de una consulta como texto
+def _explicar(conexion, consulta):
+    dialecto = conexion.dialect
+    sql = str(consulta.compile(dialect=dialecto, compile_kwargs={'literal_binds': True}))
+
+    if dialecto.name == 'sqlite':
+        filas = conexion.execute(text(f'EXPLAIN QUERY PLAN {sql}')).fetchall()
+    else:
+        if dialecto.name == 'postgresql':
+            # Con tablas chicas el planificador prefiere un seq scan;
+            # lo desactivamos para ver si el índice es utilizable
+            conexion.execute(text('SET LOCAL enable_seqscan = off'))
+        filas = conexion.execute(text(f'EXPLAIN {sql}')).fetchall()
+
+    return '\n'.join(' '.join(str(valor) for valor in fila) for fila in filas)
+
+
+# flask turnos verificar-indices
+# Corre EXPLAIN sobre las consultas frecuentes y verifica que usen los índices
+@turnos_cli.command('verificar-indices')
+def verificar_indices():
+    """Verificar con EXPLAIN que las consultas frecuentes usan los índices."""
+    errores = 0
+
+    with db.engine.connect() as conexion:
+        with conexion.begin():
+            for nombre, consulta, indices in _consultas_frecuentes():
+                plan = _explicar(conexion, consulta)
+                usados = [indice for indice in indices if indice in plan]
+
+                if usados:
+                    click.echo(f'OK     {nombre}: usa {usados[0]}')
+                else:
+                    errores += 1
+                    click.echo(f'FALTA  {nombre}: no usa {" / ".join(indices)}')
+                    click.echo(f'       plan: {plan}')
+
+    if errores:
+        raise SystemExit(1)
+
+
+# flask turnos recalcular-contadores
+# Reconstruye turnos_por_dia a partir de la tabla turnos (por si quedaron desfasados)
+@turnos_cli.command('recalcular-contadores')
+def recalcular_contadores():
+    """Recalcular los contadores de turnos por día desde la tabla turnos."""
+    dias = TurnoService.recalcular_contadores()
+    click.echo(f'Contadores recalculados ({dias} días)')
+
+
+# Convertir "90d", "12w" o "90" (días) a un timedelta
+def _parsear_antiguedad(valor):
+    texto = str(valor).strip().lower()
+    multiplicador = {'d': 1, 'w': 7}.get(texto[-1:])
+    if multiplicador:
+        texto = texto[:-1]
+
+    try:
+        dias = int(texto) * (multiplicador or 1)
+    except ValueError:
+        raise click.BadParameter(f'{valor!r} no es una antigüedad válida (ej: 90d, 12w)')
+
+    if dias < 1:
+        raise click.BadParameter('La antigüedad tiene que ser de al menos 1 día')
+
+    return timedelta(days=dias)
+
+
+# flask turnos archivar --older-than=90d
+# Mueve los turnos terminados (no reservados) más viejos que el corte a turnos_historico
+# Se puede correr con la app andando: cada lote es una transacción corta
+@turnos_cli.command('archivar')
+@click.option('--older-than', 'antiguedad', default='90d', show_default=True,
+              help='Archivar turnos con fecha anterior a hoy menos esto (ej: 90d, 12w).')
+@click.option('--lote', default=1000, show_default=True, help='Turnos por lote (uno por transacción).')
+@click.option('--pausa', default=0.1, show_default=True, help='Segundos de espera entre lotes.')
+@click.option('--simular', is_flag=True, help='Solo contar los turnos que se archivarían.')
+def archivar(antiguedad, lote, pausa, simular):
+    """Mover los turnos terminados viejos a la tabla turnos_historico."""
+    corte = date.today() - _parsear_antiguedad(antiguedad)
+
+    if simular:
+        cantidad = db.session.scalar(
+            select(func.count()).select_from(Turno).where(Turno.fecha < corte, Turno.estado != 'reservado')
+        )
+        click.echo(f'Se archivarían {cantidad:,} turnos anteriores al {corte.isoformat()}')
+        return
+
+    total = 0
+    ultimo_id = 0
+    while True:
+        cantidad, ultimo_id = TurnoService.archivar_lote(corte, lote=lote, despues_de_id=ultimo_id)
+        if not cantidad:
+            break
+
+        total += cantidad
+        click.echo(f'  {total:,} turnos archivados', err=True)
+
+        # Dejamos respirar a la BD entre lotes
+        if pausa:
+            time.sleep(pausa)
+
+    click.echo(f'Archivados {total:,} turnos anteriores al {corte.isoformat()}')
@@ -1,11 +1,26 @@
 from app.database import db
 from datetime import datetime
+import hashlib
 import secrets
 
 # Modelo Turno: representa una reserva de turno en la barbería
 class Turno(db.Model):
     __tablename__ = 'turnos'
     
+    # Índices para las consultas frecuentes (se crean con las migraciones)
+    # Los parciales solo cubren los turnos reservados, que son los que se consultan todo el tiempo
+    # uq_turnos_reservados_fecha_hora además garantiza que no haya dos reservas en el mismo horario
+    # y uq_turnos_reservados_client que cada cliente tenga un solo turno activo
+    __table_args__ = (
+        db.Index('ix_turnos_fecha_hora', 'fecha', 'hora'),
+        db.Index('uq_turnos_reservados_fecha_hora', 'fecha', 'hora', unique=True,
+                 postgresql_where=db.text("estado = 'reservado'"),
+                 sqlite_where=db.text("estado = 'reservado'")),
+        db.Index('uq_turnos_reservados_client', 'client_id', unique=True,
+                 postgresql_where=db.text("estado = 'reservado'"),
+                 sqlite_where=db.text("estado = 'reservado'")),
+    )
+    
     # ID único del turno
     id = db.Column(db.Integer, primary_key=True)
     
@@ -29,9 +44,10 @@ class Turno(db.Model):
     # Estado del turno: 'reservado', 'completado', 'cancelado', 'no-show'
     estado = db.Column(db.String(20), nullable=False, default='reservado')
     
-    # Token único para cancelar el turno (sin necesidad de estar logueado)
-    # Se genera aleatoriamente y se pasa por URL
-    token_cancelacion = db.Column(db.String(200), unique=True, nullable=False)
+    # Hash (SHA-256, 64 caracteres hex) del token para cancelar el turno
+    # El token en sí se genera aleatoriamente, se pasa por URL y no se guarda:
+    # para cancelar se hashea el token recibido y se busca por este hash
+    token_hash = db.Column(db.String(64), unique=True, nullable=False)
     
     # Timestamps
     creado_en = db.Column(db.DateTime, default=datetime.utcnow)
@@ -39,28 +55,35 @@ class Turno(db.Model):
     
     def __init__(self, **kwargs):
         # Generamos automáticamente el token de cancelación
+        # token_cancelacion solo existe en el objeto recién creado (no se guarda en la BD)
         super().__init__(**kwargs)
         self.token_cancelacion = self._generar_token()
+        self.token_hash = self.hashear_token(self.token_cancelacion)
     
-    # Generar token seguro de 200 caracteres
+    # Generar token seguro (32 bytes aleatorios = 43 caracteres URL-safe)
     @staticmethod
     def _generar_token():
-        return secrets.token_urlsafe(150)
+        return secrets.token_urlsafe(32)
+    
+    # Hash del token que se guarda en la BD (y con el que se busca el turno)
+    @staticmethod
+    def hashear_token(token):
+        return hashlib.sha256(str(token).encode()).hexdigest()
     
     # Convertir objeto a diccionario para JSON
+    # (fechas y horas quedan como objetos: las pasa a ISO 8601 el proveedor JSON de la app)
     def to_dict(self):
         return {
             'id': self.id,
-            'fecha': self.fecha.isoformat() if self.fecha else None,
-            'hora': self.hora.isoformat() if self.hora else None,
+            'fecha': self.fecha,
+            'hora': self.hora,
             'servicio_id': self.servicio_id,
             'nombre_cliente': self.nombre_cliente,
             'telefono_cliente': self.telefono_cliente,
             'client_id': self.client_id,
             'estado': self.estado,
-            'token_cancelacion': self.token_cancelacion,
-            'creado_en': self.creado_en.isoformat() if self.creado_en else None,
-            'actualizado_en': self.actualizado_en.isoformat() if self.actualizado_en else None,
+            'creado_en': self.creado_en,
+            'actualizado_en': self.actualizado_en,
         }
     
     # Método para verificar si el turno está activo
@@ -70,4 +93,63 @@ class Turno(db.Model):
     # Método para cancelar el turno
     def cancelar(self):
         self.estado = 'cancelado'
-        self.actualizado_en = datetime.utcnow()
\ No newline at end of file
+        self.actualizado_en = datetime.utcnow()
+
+# Modelo TurnoHistorico: turnos terminados (completados, cancelados, no-show) ya archivados
+# "flask turnos archivar" los mueve desde la tabla turnos,
+# así turnos queda chica y solo con lo que se consulta todos los días
+# No tiene token_hash: un turno terminado ya no se puede cancelar
+class TurnoHistorico(db.Model):
+    __tablename__ = 'turnos_historico'
+    
+    __table_args__ = (
+        db.Index('ix_turnos_historico_fecha_hora', 'fecha', 'hora'),
+    )
+    
+    # Clave propia de la tabla: el id de turnos no sirve como clave porque se puede
+    # reusar (SQLite, o MySQL < 8 al reiniciar, reusan los ids más altos borrados)
+    historico_id = db.Column('id', db.Integer, primary_key=True)
+    
+    # Id que tenía en turnos (columna turno_id; como atributo se llama "id"
+    # para que los listados y el cursor traten igual a los dos modelos)
+    id = db.Column('turno_id', db.Integer, nullable=False)
+    
+    fecha = db.Column(db.Date, nullable=False)
+    hora = db.Column(db.Time, nullable=False)
+    servicio_id = db.Column(db.Integer, nullable=False)
+    nombre_cliente = db.Column(db.String(120), nullable=False)
+    telefono_cliente = db.Column(db.String(30), nullable=False)
+    client_id = db.Column(db.String(100), nullable=False)
+    estado = db.Column(db.String(20), nullable=False)
+    creado_en = db.Column(db.DateTime)
+    actualizado_en = db.Column(db.DateTime)
+    
+    # Cuándo se movió al histórico
+    archivado_en = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    # Mismo formato que Turno.to_dict (los listados mezclan turnos de las dos tablas)
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'fecha': self.fecha,
+            'hora': self.hora,
+            'servicio_id': self.servicio_id,
+            'nombre_cliente': self.nombre_cliente,
+            'telefono_cliente': self.telefono_cliente,
+            'client_id': self.client_id,
+            'estado': self.estado,
+            'creado_en': self.creado_en,
+            'actualizado_en': self.actualizado_en,
+        }
+
+# Modelo TurnosPorDia: contador de turnos ocupados por fecha
+# Permite controlar Negocio.max_turnos sin hacer un COUNT(*) sobre turnos en cada reserva
+# Se actualiza en la misma transacción que crea, cancela o elimina el turno
+class TurnosPorDia(db.Model):
+    __tablename__ = 'turnos_por_dia'
+    
+    # Fecha (una fila por día con turnos)
+    fecha = db.Column(db.Date, primary_key=True)
+    
+    # Cantidad de turnos del día que no están cancelados
+    reservados = db.Column(db.Integer, nullable=False, default=0)
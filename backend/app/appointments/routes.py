@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
-from app.appointments.service import TurnoService
+from app.appointments.service import TurnoService, MAX_DIAS_DISPONIBILIDAD
 from app.appointments.models import Turno
+from app.presupuesto_consultas import presupuesto_consultas
 import uuid
 
 # Creamos un Blueprint para las rutas de turnos
@@ -24,6 +25,7 @@ def obtener_client_id():
 # Ruta GET /api/appointments/turno-actual
 # Obtener el turno actual del cliente (si existe)
 @appointments_bp.route('/turno-actual', methods=['GET'])
+@presupuesto_consultas(1)
 def obtener_turno_actual():
     # Obtenemos el client_id del query param
     client_id = request.args.get('client_id')
@@ -31,25 +33,20 @@ def obtener_turno_actual():
     if not client_id:
         return jsonify({'error': 'Falta client_id'}), 400
     
-    # Buscamos si tiene turno activo
-    turno = TurnoService.obtener_turno_activo(client_id)
+    # Buscamos si tiene turno activo (cacheado por client_id)
+    turno = TurnoService.obtener_turno_activo_dict(client_id)
     
-    if not turno:
-        return jsonify({
-            'success': True,
-            'turno': None
-        }), 200
-    
-    # Retornamos el turno
+    # Retornamos el turno (None si no tiene)
     return jsonify({
         'success': True,
-        'turno': turno.to_dict()
+        'turno': turno
     }), 200
 
 # Ruta GET /api/appointments/horarios-disponibles
 # Obtener horarios disponibles para una fecha
 # Query params: fecha (YYYY-MM-DD)
 @appointments_bp.route('/horarios-disponibles', methods=['GET'])
+@presupuesto_consultas(4)  # 2 con la plantilla de slots cacheada
 def obtener_horarios():
     # Obtenemos la fecha del query param
     fecha = request.args.get('fecha')
@@ -70,10 +67,48 @@ def obtener_horarios():
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
+# Ruta GET /api/appointments/disponibilidad
+# Obtener la disponibilidad de un rango de fechas (para el calendario de reservas)
+# Query params: desde, hasta (YYYY-MM-DD)
+@appointments_bp.route('/disponibilidad', methods=['GET'])
+@presupuesto_consultas(4)  # 2 con la plantilla de slots cacheada
+def obtener_disponibilidad():
+    # Obtenemos el rango de fechas
+    desde = request.args.get('desde')
+    hasta = request.args.get('hasta')
+    
+    if not desde or not hasta:
+        return jsonify({'error': 'Faltan parámetros desde y hasta'}), 400
+    
+    try:
+        from datetime import datetime
+        inicio = datetime.strptime(desde, '%Y-%m-%d').date()
+        fin = datetime.strptime(hasta, '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({'error': 'Formato de fecha inválido (YYYY-MM-DD)'}), 400
+    
+    # Validamos el rango
+    if fin < inicio:
+        return jsonify({'error': 'La fecha hasta debe ser posterior a desde'}), 400
+    
+    if (fin - inicio).days + 1 > MAX_DIAS_DISPONIBILIDAD:
+        return jsonify({'error': f'El rango no puede superar {MAX_DIAS_DISPONIBILIDAD} días'}), 400
+    
+    # Obtenemos la disponibilidad de todo el rango
+    dias = TurnoService.obtener_disponibilidad_rango(inicio, fin)
+    
+    return jsonify({
+        'success': True,
+        'desde': desde,
+        'hasta': hasta,
+        'dias': dias
+    }), 200
+
 # Ruta POST /api/appointments/reservar
 # Crear un nuevo turno
 # Body: fecha, hora, servicio_id, nombre_cliente, telefono_cliente, client_id
 @appointments_bp.route('/reservar', methods=['POST'])
+@presupuesto_consultas(10)
 def reservar_turno():
     # Obtenemos los datos del request
     data = request.get_json()
@@ -102,6 +137,7 @@ def reservar_turno():
 # Cancelar un turno por token
 # Body: token_cancelacion
 @appointments_bp.route('/cancelar', methods=['POST'])
+@presupuesto_consultas(4)
 def cancelar_turno():
     # Obtenemos el token del request
     data = request.get_json()
@@ -120,6 +156,7 @@ def cancelar_turno():
 # Ruta GET /api/appointments/proximo-disponible
 # Obtener la próxima fecha con turnos disponibles
 @appointments_bp.route('/proximo-disponible', methods=['GET'])
+@presupuesto_consultas(4)  # 2 con la plantilla de slots cacheada
 def obtener_proximo():
     # Obtenemos el próximo turno disponible (en los próximos 7 días)
     resultado = TurnoService.obtener_proximo_turno_disponible(dias_adelante=7)
@@ -137,8 +174,9 @@ def obtener_proximo():
 
 # Ruta GET /api/appointments/turnos
 # Obtener turnos (solo para admin, protegida con JWT)
-# Query params: fecha_inicio, fecha_fin, estado
+# Query params: fecha_inicio, fecha_fin, estado, historico (1 = incluir los turnos archivados)
 @appointments_bp.route('/turnos', methods=['GET'])
+@presupuesto_consultas(2)  # 1 sin historico
 def obtener_turnos():
     from flask_jwt_extended import jwt_required, get_jwt_identity
     from functools import wraps
@@ -152,6 +190,7 @@ def obtener_turnos():
     fecha_inicio = request.args.get('fecha_inicio')
     fecha_fin = request.args.get('fecha_fin')
     estado = request.args.get('estado', 'reservado')
+    historico = request.args.get('historico', '').lower() in ('1', 'true')
     
     if not fecha_inicio or not fecha_fin:
         return jsonify({'error': 'Faltan fecha_inicio y fecha_fin'}), 400
@@ -162,7 +201,7 @@ def obtener_turnos():
         fin = datetime.strptime(fecha_fin, '%Y-%m-%d').date()
         
         # Obtenemos los turnos
-        turnos = TurnoService.obtener_turnos_rango(inicio, fin, estado)
+        turnos = TurnoService.obtener_turnos_rango(inicio, fin, estado, historico=historico)
         
         return jsonify({
             'success': True,
@@ -1,11 +1,31 @@
-from app.appointments.models import Turno
+from app.appointments.models import Turno, TurnoHistorico, TurnosPorDia
+from app.cache import CacheTTL
+from app.config import Config
 from app.database import db
 from datetime import datetime, timedelta, time
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, update, case, delete, func, insert, literal, select
+from sqlalchemy.exc import IntegrityError
+
+# Máximo de días que se pueden pedir de una vez en /disponibilidad (calendario de reservas)
+MAX_DIAS_DISPONIBILIDAD = 60
+
+# Columnas que se copian de turnos a turnos_historico al archivar
+# (el id del turno va a turno_id, que en TurnoHistorico es el atributo "id")
+COLUMNAS_HISTORICO = [
+    'id', 'fecha', 'hora', 'servicio_id', 'nombre_cliente', 'telefono_cliente',
+    'client_id', 'estado', 'creado_en', 'actualizado_en',
+]
+
+# Cache client_id -> turno activo (dict) o None si no tiene
+# Se invalida cada vez que cambia el estado de un turno del cliente
+cache_turno_activo = CacheTTL(
+    maximo=Config.TURNO_ACTIVO_CACHE_MAX,
+    ttl=Config.TURNO_ACTIVO_CACHE_TTL
+)
 
 # Servicio para manejar la lógica de turnos
 class TurnoService:
-    
+
     # Obtener turno activo de un cliente
     @staticmethod
     def obtener_turno_activo(client_id):
@@ -17,12 +37,203 @@ class TurnoService:
         
         return turno
     
+    # Obtener el turno activo de un cliente como dict (usando la cache)
+    # Retorna None si no tiene (también se cachea)
+    @staticmethod
+    def obtener_turno_activo_dict(client_id):
+        encontrado, turno = cache_turno_activo.obtener(client_id)
+        if encontrado:
+            return turno
+        
+        turno = TurnoService.obtener_turno_activo(client_id)
+        turno = turno.to_dict() if turno else None
+        
+        cache_turno_activo.guardar(client_id, turno)
+        return turno
+    
     # Verificar si un cliente ya tiene turno activo
+    # Usa la cache: si quedara desactualizada, igual la BD no permite dos
+    # turnos reservados del mismo cliente (uq_turnos_reservados_client)
     @staticmethod
     def cliente_tiene_turno_activo(client_id):
-        turno = TurnoService.obtener_turno_activo(client_id)
+        turno = TurnoService.obtener_turno_activo_dict(client_id)
         return turno is not None
     
+    # Olvidar el turno activo cacheado de uno o más clientes
+    @staticmethod
+    def invalidar_turno_activo(*client_ids):
+        for client_id in client_ids:
+            cache_turno_activo.invalidar(client_id)
+    
+    # Obtener las horas ya reservadas de una fecha (formato 'HH:MM')
+    # SELECT hora FROM turnos WHERE fecha = ? AND estado = 'reservado'
+    @staticmethod
+    def obtener_horas_reservadas(fecha):
+        filas = db.session.query(Turno.hora).filter(
+            Turno.fecha == fecha,
+            Turno.estado == 'reservado'
+        ).all()
+        
+        return {hora.strftime('%H:%M') for (hora,) in filas}
+    
+    # Obtener las horas reservadas de un rango de fechas, agrupadas por fecha
+    # Retorna un dict {fecha: {'HH:MM', ...}} con una sola consulta
+    @staticmethod
+    def obtener_horas_reservadas_rango(fecha_inicio, fecha_fin):
+        filas = db.session.query(Turno.fecha, Turno.hora).filter(
+            Turno.fecha >= fecha_inicio,
+            Turno.fecha <= fecha_fin,
+            Turno.estado == 'reservado'
+        ).all()
+        
+        horas_por_fecha = {}
+        for fecha, hora in filas:
+            horas_por_fecha.setdefault(fecha, set()).add(hora.strftime('%H:%M'))
+        
+        return horas_por_fecha
+    
+    # Sumar un turno al contador del día, respetando el máximo de turnos
+    # Es un solo UPDATE condicional: si el día está completo no modifica nada
+    # Retorna True si se pudo sumar, False si el día ya está completo
+    @staticmethod
+    def sumar_turno_del_dia(fecha, max_turnos=None):
+        # UPDATE turnos_por_dia SET reservados = reservados + 1
+        # WHERE fecha = ? AND reservados < max_turnos
+        consulta = update(TurnosPorDia).where(TurnosPorDia.fecha == fecha)
+        if max_turnos is not None:
+            consulta = consulta.where(TurnosPorDia.reservados < max_turnos)
+        
+        resultado = db.session.execute(
+            consulta.values(reservados=TurnosPorDia.reservados + 1),
+            execution_options={'synchronize_session': False}
+        )
+        
+        if resultado.rowcount:
+            return True
+        
+        # No se actualizó nada: o el día está completo o todavía no tiene fila
+        if db.session.get(TurnosPorDia, fecha) is not None:
+            return False
+        
+        if max_turnos is not None and max_turnos < 1:
+            return False
+        
+        try:
+            # Primer turno del día: creamos la fila (en un savepoint por si
+            # otra reserva simultánea la crea primero)
+            with db.session.begin_nested():
+                db.session.add(TurnosPorDia(fecha=fecha, reservados=1))
+            return True
+        except IntegrityError:
+            # La fila ya la creó otra reserva: volvemos a intentar el UPDATE
+            return TurnoService.sumar_turno_del_dia(fecha, max_turnos)
+    
+    # Restar turnos del contador del día (cuando se cancelan o eliminan)
+    @staticmethod
+    def restar_turno_del_dia(fecha, cantidad=1):
+        # UPDATE turnos_por_dia SET reservados = reservados - ? WHERE fecha = ? (sin bajar de 0)
+        db.session.execute(
+            update(TurnosPorDia)
+            .where(TurnosPorDia.fecha == fecha)
+            .values(reservados=case(
+                (TurnosPorDia.reservados > cantidad, TurnosPorDia.reservados - cantidad),
+                else_=0
+            )),
+            execution_options={'synchronize_session': False}
+        )
+    
+    # Ajustar los contadores de varios días a la vez: cambios = {fecha: +n / -n}
+    # Es un solo UPDATE para todos los días (sin bajar de 0, sin tope de max_turnos):
+    # UPDATE turnos_por_dia SET reservados = reservados + CASE fecha WHEN ? THEN ? ... END
+    # WHERE fecha IN (...)
+    # Si algún día que suma todavía no tiene fila, se crea (una consulta y un INSERT más)
+    @staticmethod
+    def ajustar_contadores(cambios):
+        cambios = {fecha: cantidad for fecha, cantidad in cambios.items() if cantidad}
+        if not cambios:
+            return
+        
+        nuevo = TurnosPorDia.reservados + case(cambios, value=TurnosPorDia.fecha, else_=0)
+        resultado = db.session.execute(
+            update(TurnosPorDia)
+            .where(TurnosPorDia.fecha.in_(cambios))
+            .values(reservados=case((nuevo > 0, nuevo), else_=0)),
+            execution_options={'synchronize_session': False}
+        )
+        
+        a_sumar = [fecha for fecha, cantidad in cambios.items() if cantidad > 0]
+        if not a_sumar or resultado.rowcount == len(cambios):
+            return
+        
+        existentes = set(db.session.scalars(select(TurnosPorDia.fecha).where(TurnosPorDia.fecha.in_(a_sumar))))
+        faltantes = [{'fecha': fecha, 'reservados': cambios[fecha]} for fecha in a_sumar if fecha not in existentes]
+        if faltantes:
+            db.session.execute(insert(TurnosPorDia), faltantes)
+    
+    # Reconstruir turnos_por_dia desde la tabla turnos (por si quedaron desfasados)
+    # Retorna la cantidad de días con turnos
+    @staticmethod
+    def recalcular_contadores():
+        # DELETE FROM turnos_por_dia;
+        # INSERT INTO turnos_por_dia SELECT fecha, COUNT(*) FROM turnos WHERE estado != 'cancelado' GROUP BY fecha
+        db.session.execute(delete(TurnosPorDia))
+        resultado = db.session.execute(
+            insert(TurnosPorDia).from_select(
+                ['fecha', 'reservados'],
+                select(Turno.fecha, func.count())
+                .where(Turno.estado != 'cancelado')
+                .group_by(Turno.fecha)
+            )
+        )
+        db.session.commit()
+        
+        return resultado.rowcount
+    
+    # Obtener los contadores de un rango de fechas
+    # Retorna un dict {fecha: reservados} (las fechas sin turnos no aparecen)
+    @staticmethod
+    def obtener_reservados_rango(fecha_inicio, fecha_fin):
+        filas = db.session.query(TurnosPorDia.fecha, TurnosPorDia.reservados).filter(
+            TurnosPorDia.fecha >= fecha_inicio,
+            TurnosPorDia.fecha <= fecha_fin
+        ).all()
+        
+        return dict(filas)
+    
+    # Verificar si un día llegó al máximo de turnos
+    @staticmethod
+    def dia_completo(reservados, max_turnos):
+        return max_turnos is not None and reservados >= max_turnos
+    
+    # Armar la lista de horarios (disponible/reservado) a partir de los slots del día
+    # Si el día está completo (max_turnos), ningún horario queda disponible
+    @staticmethod
+    def _armar_horarios(slots, horas_reservadas, completo=False):
+        horarios = []
+        
+        for slot in slots:
+            if completo and slot not in horas_reservadas:
+                horarios.append({
+                    'hora': slot,
+                    'disponible': False,
+                    'estado': 'completo'
+                })
+            # Si no existe turno en ese horario, está disponible
+            elif slot not in horas_reservadas:
+                horarios.append({
+                    'hora': slot,
+                    'disponible': True,
+                    'estado': 'disponible'
+                })
+            else:
+                horarios.append({
+                    'hora': slot,
+                    'disponible': False,
+                    'estado': 'reservado'
+                })
+        
+        return horarios
+    
     # Obtener todos los horarios disponibles para una fecha
     @staticmethod
     def obtener_horarios_disponibles(fecha, duracion_turno=60):
@@ -44,35 +255,19 @@ class TurnoService:
         if not slots:
             return []
         
-        # Ahora filtramos cuáles de esos slots ya están reservados
-        horarios_disponibles = []
+        # Traemos en una sola consulta todas las horas reservadas de esa fecha
+        # (en vez de hacer un SELECT por cada slot)
+        horas_reservadas = TurnoService.obtener_horas_reservadas(fecha_obj)
         
-        for slot in slots:
-            # Convertimos el slot a objeto time
-            slot_time = datetime.strptime(slot, '%H:%M').time()
-            
-            # Buscamos si ya hay un turno reservado en ese horario
-            turno_existe = Turno.query.filter_by(
-                fecha=fecha_obj,
-                hora=slot_time,
-                estado='reservado'
-            ).first()
-            
-            # Si no existe turno en ese horario, está disponible
-            if not turno_existe:
-                horarios_disponibles.append({
-                    'hora': slot,
-                    'disponible': True,
-                    'estado': 'disponible'
-                })
-            else:
-                horarios_disponibles.append({
-                    'hora': slot,
-                    'disponible': False,
-                    'estado': 'reservado'
-                })
+        # ¿El día ya llegó al máximo de turnos? (lectura de una sola fila)
+        contador = db.session.get(TurnosPorDia, fecha_obj)
+        completo = TurnoService.dia_completo(
+            contador.reservados if contador else 0,
+            NegocioService.obtener_max_turnos()
+        )
         
-        return horarios_disponibles
+        # Ahora filtramos cuáles de esos slots ya están reservados (en memoria)
+        return TurnoService._armar_horarios(slots, horas_reservadas, completo)
     
     # Crear un nuevo turno
     @staticmethod
@@ -95,28 +290,25 @@ class TurnoService:
         else:
             hora_obj = hora
         
-        # Validación 2: ¿Ese horario ya está reservado?
-        turno_existe = Turno.query.filter_by(
-            fecha=fecha_obj,
-            hora=hora_obj,
-            servicio_id=servicio_id,
-            estado='reservado'
-        ).first()
-        
-        if turno_existe:
-            return {
-                'success': False,
-                'mensaje': 'Ese horario ya está reservado. Elegí otro.'
-            }
-        
-        # Validación 3: ¿La fecha no es en el pasado?
+        # Validación 2: ¿La fecha no es en el pasado?
         if fecha_obj < datetime.now().date():
             return {
                 'success': False,
                 'mensaje': 'No podés reservar en fechas pasadas.'
             }
         
+        from app.business.service import NegocioService
+        
         try:
+            # Validación 3: ¿El día ya llegó al máximo de turnos?
+            # Sumamos al contador del día en la misma transacción que el turno
+            if not TurnoService.sumar_turno_del_dia(fecha_obj, NegocioService.obtener_max_turnos()):
+                db.session.rollback()
+                return {
+                    'success': False,
+                    'mensaje': 'No quedan turnos para ese día. Elegí otra fecha.'
+                }
+            
             # Crear el turno
             turno = Turno(
                 fecha=fecha_obj,
@@ -129,13 +321,45 @@ class TurnoService:
             )
             
             # Guardar en la BD
+            # No consultamos antes si el horario está libre: la BD no permite dos
+            # turnos reservados en la misma fecha y hora (uq_turnos_reservados_fecha_hora),
+            # así que dos reservas simultáneas no pueden pasar las dos
             db.session.add(turno)
             db.session.commit()
             
+            TurnoService.invalidar_turno_activo(client_id)
+            
+            # El token de cancelación solo se puede devolver ahora (en la BD queda el hash)
             return {
                 'success': True,
                 'mensaje': 'Turno reservado exitosamente',
-                'turno': turno.to_dict()
+                'turno': {
+                    **turno.to_dict(),
+                    'token_cancelacion': turno.token_cancelacion
+                }
+            }
+        
+        except IntegrityError as e:
+            db.session.rollback()
+            TurnoService.invalidar_turno_activo(client_id)
+            
+            # La BD rechazó el turno: ¿el cliente ya tenía uno? (la cache estaba vieja)
+            if TurnoService.obtener_turno_activo(client_id):
+                return {
+                    'success': False,
+                    'mensaje': 'Ya tenés un turno activo. Cancelalo para hacer otro.'
+                }
+            
+            # ¿O fue porque ese horario ya está reservado?
+            if hora_obj.strftime('%H:%M') in TurnoService.obtener_horas_reservadas(fecha_obj):
+                return {
+                    'success': False,
+                    'mensaje': 'Ese horario ya está reservado. Elegí otro.'
+                }
+            
+            return {
+                'success': False,
+                'mensaje': f'Error al crear turno: {str(e)}'
             }
         
         except Exception as e:
@@ -148,9 +372,9 @@ class TurnoService:
     # Cancelar turno por token
     @staticmethod
     def cancelar_turno_por_token(token_cancelacion):
-        # Buscamos el turno por el token
+        # Buscamos el turno por el hash del token
         turno = Turno.query.filter_by(
-            token_cancelacion=token_cancelacion,
+            token_hash=Turno.hashear_token(token_cancelacion),
             estado='reservado'
         ).first()
         
@@ -161,10 +385,13 @@ class TurnoService:
             }
         
         try:
-            # Cancelamos el turno
+            # Cancelamos el turno y liberamos su lugar en el contador del día
             turno.cancelar()
+            TurnoService.restar_turno_del_dia(turno.fecha)
             db.session.commit()
             
+            TurnoService.invalidar_turno_activo(turno.client_id)
+            
             return {
                 'success': True,
                 'mensaje': 'Turno cancelado exitosamente'
@@ -178,8 +405,9 @@ class TurnoService:
             }
     
     # Obtener turnos de un rango de fechas (para admin)
+    # Con historico=True también busca en turnos_historico (una consulta más)
     @staticmethod
-    def obtener_turnos_rango(fecha_inicio, fecha_fin, estado='reservado'):
+    def obtener_turnos_rango(fecha_inicio, fecha_fin, estado='reservado', historico=False):
         # Query para obtener turnos en ese rango
         turnos = Turno.query.filter(
             Turno.fecha >= fecha_inicio,
@@ -187,25 +415,127 @@ class TurnoService:
             Turno.estado == estado
         ).order_by(Turno.fecha, Turno.hora).all()
         
+        # Los reservados nunca se archivan
+        if historico and estado != 'reservado':
+            archivados = TurnoHistorico.query.filter(
+                TurnoHistorico.fecha >= fecha_inicio,
+                TurnoHistorico.fecha <= fecha_fin,
+                TurnoHistorico.estado == estado
+            ).order_by(TurnoHistorico.fecha, TurnoHistorico.hora).all()
+            turnos = sorted(turnos + archivados, key=lambda t: (t.fecha, t.hora, t.id))
+        
         return turnos
     
+    # Archivar un lote de turnos terminados (no reservados) con fecha anterior a "corte"
+    # Los copia a turnos_historico y los borra de turnos en una sola transacción
+    # Recorre por id: "despues_de_id" es el último id del lote anterior
+    # Retorna (cantidad archivada, último id visto) o (0, None) si no quedan
+    @staticmethod
+    def archivar_lote(corte, lote=1000, despues_de_id=0):
+        try:
+            # Elegimos y bloqueamos el lote; SKIP LOCKED saltea los turnos que
+            # otra transacción está modificando (quedan para la próxima corrida)
+            # En SQLite no hay FOR UPDATE: las escrituras ya son de a una
+            ids = list(db.session.scalars(
+                select(Turno.id)
+                .where(Turno.fecha < corte, Turno.estado != 'reservado', Turno.id > despues_de_id)
+                .order_by(Turno.id)
+                .limit(lote)
+                .with_for_update(skip_locked=True)
+            ))
+            
+            if not ids:
+                db.session.rollback()
+                return 0, None
+            
+            # INSERT INTO turnos_historico (...) SELECT ... FROM turnos WHERE id IN (...)
+            db.session.execute(
+                insert(TurnoHistorico).from_select(
+                    [getattr(TurnoHistorico, columna) for columna in COLUMNAS_HISTORICO + ['archivado_en']],
+                    select(
+                        *[getattr(Turno, columna) for columna in COLUMNAS_HISTORICO],
+                        literal(datetime.utcnow(), type_=db.DateTime)
+                    ).where(Turno.id.in_(ids))
+                )
+            )
+            
+            # turnos_por_dia cuenta los turnos no cancelados que hay en turnos:
+            # los que se van al histórico dejan de contar (son días pasados,
+            # así que no cambia la disponibilidad)
+            ocupados = db.session.execute(
+                select(Turno.fecha, func.count())
+                .where(Turno.id.in_(ids), Turno.estado != 'cancelado')
+                .group_by(Turno.fecha)
+            ).all()
+            for fecha, cantidad in ocupados:
+                TurnoService.restar_turno_del_dia(fecha, cantidad)
+            
+            db.session.execute(
+                delete(Turno).where(Turno.id.in_(ids)),
+                execution_options={'synchronize_session': False}
+            )
+            db.session.commit()
+            
+            return len(ids), ids[-1]
+        except Exception:
+            db.session.rollback()
+            raise
+    
+    # Obtener la disponibilidad de un rango de fechas (calendario de reservas)
+    # Usa una cantidad fija de consultas: los slots de la semana salen de la
+    # plantilla cacheada de NegocioService, hay una consulta sobre turnos
+    # y otra sobre los contadores por día
+    @staticmethod
+    def obtener_disponibilidad_rango(fecha_inicio, fecha_fin):
+        from app.business.service import NegocioService
+        
+        # Slots de cada día de la semana (0 = lunes, 6 = domingo), desde la cache
+        slots_semana = NegocioService.obtener_slots_semana()
+        
+        # Horas reservadas de todo el rango, agrupadas por fecha
+        horas_por_fecha = TurnoService.obtener_horas_reservadas_rango(fecha_inicio, fecha_fin)
+        
+        # Turnos ocupados por día (para saber qué días están completos sin contar)
+        reservados_por_fecha = TurnoService.obtener_reservados_rango(fecha_inicio, fecha_fin)
+        max_turnos = NegocioService.obtener_max_turnos()
+        
+        dias = []
+        fecha = fecha_inicio
+        
+        while fecha <= fecha_fin:
+            completo = TurnoService.dia_completo(reservados_por_fecha.get(fecha, 0), max_turnos)
+            
+            horarios = TurnoService._armar_horarios(
+                slots_semana[fecha.weekday()],
+                horas_por_fecha.get(fecha, set()),
+                completo
+            )
+            
+            dias.append({
+                'fecha': fecha.isoformat(),
+                'disponible': any(h['disponible'] for h in horarios),
+                'completo': completo,
+                'horarios': horarios
+            })
+            
+            fecha += timedelta(days=1)
+        
+        return dias
+    
     # Obtener próximo turno disponible
     @staticmethod
     def obtener_proximo_turno_disponible(dias_adelante=7):
         # Buscamos el próximo día con turnos disponibles
-        from app.business.service import NegocioService
-        
         hoy = datetime.now().date()
         
-        for i in range(dias_adelante):
-            fecha_check = hoy + timedelta(days=i)
-            horarios = TurnoService.obtener_horarios_disponibles(fecha_check)
-            
+        dias = TurnoService.obtener_disponibilidad_rango(hoy, hoy + timedelta(days=dias_adelante - 1))
+        
+        for dia in dias:
             # Si hay horarios disponibles, retornamos esa fecha
-            if any(h['disponible'] for h in horarios):
+            if dia['disponible']:
                 return {
-                    'fecha': fecha_check.isoformat(),
-                    'horarios': horarios
+                    'fecha': dia['fecha'],
+                    'horarios': dia['horarios']
                 }
         
-        return None
\ No newline at end of file
+        return None
@@ -39,6 +39,6 @@ class Usuario(db.Model):
         return {
             'id': self.id,
             'nombre_usuario': self.nombre_usuario,
-            'creado_en': self.creado_en.isoformat(),
-            'actualizado_en': self.actualizado_en.isoformat()
+            'creado_en': self.creado_en,
+            'actualizado_en': self.actualizado_en
         }
\ No newline at end of file
@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt, get_jwt_identity
 from app.auth.service import AuthService
-from app.auth.models import Usuario
+from app.presupuesto_consultas import presupuesto_consultas
 from datetime import timedelta
 
 # Creamos un Blueprint para las rutas de auth
@@ -35,15 +35,17 @@ def login():
     usuario = resultado['usuario']
     
     # Generamos un JWT con el ID del usuario como identidad
+    # Incluye el perfil (sin datos sensibles) para que las vistas no tengan que ir a la BD
     # El JWT expira en 24 horas (86400 segundos)
     access_token = create_access_token(
         identity=str(usuario.id),
+        additional_claims=AuthService.claims_usuario(usuario),
         expires_delta=timedelta(hours=24)
     )
     
     # Imprimir el token generado (solo para debugging, quitar en producción)
     print(f'==========\nToken generado para usuario {usuario.nombre_usuario}: {access_token}\n==========')
-
+    
     # Retornamos el token y info del usuario
     return jsonify({
         'success': True,
@@ -55,17 +57,19 @@ def login():
 # Esta ruta solo se puede acceder si el cliente envía un JWT válido
 @auth_bp.route('/me', methods=['GET'])
 @jwt_required()
+@presupuesto_consultas(1)
 def obtener_usuario_actual():
     usuario_id = get_jwt_identity()  # Esto ahora vendrá como string
     
-    # Convertir a integer para buscar en la BD
-    usuario = Usuario.query.get(int(usuario_id))
+    # Convertir a integer y armar el perfil desde los claims del token
+    # (la BD solo se consulta si la cache no confirma que el token está al día)
+    usuario = AuthService.perfil_desde_claims(int(usuario_id), get_jwt())
     
     if not usuario:
         return jsonify({'error': 'Usuario no encontrado'}), 404
     
     return jsonify({
-        'usuario': usuario.to_dict()
+        'usuario': usuario
     }), 200
 
 # Ruta POST /api/auth/logout (opcional, para lógica de backend)
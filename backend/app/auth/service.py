@@ -1,5 +1,15 @@
 from app.auth.models import Usuario
+from app.cache import CacheTTL
+from app.config import Config
 from app.database import db
+from sqlalchemy import event
+
+# Cache id de usuario -> perfil (to_dict) para no consultar la BD en cada /me
+# Se invalida sola cuando el usuario se modifica o se borra (eventos de abajo)
+cache_usuarios = CacheTTL(
+    maximo=Config.USUARIO_CACHE_MAX,
+    ttl=Config.USUARIO_CACHE_TTL
+)
 
 # Servicio de autenticación: centraliza la lógica de login
 # Esto lo hacemos así para no mezclar la lógica con las rutas
@@ -11,7 +21,7 @@ class AuthService:
         # Consultamos la BD: "SELECT * FROM usuarios WHERE nombre_usuario = ?"
         usuario = Usuario.query.filter_by(nombre_usuario=nombre_usuario).first()
         return usuario
-
+    
     # Método para validar credenciales (nombre + contrasena)
     # Retorna un diccionario con success (True/False) y el usuario si es exitoso
     @staticmethod
@@ -41,4 +51,63 @@ class AuthService:
             'success': True,
             'mensaje': 'Credenciales válidas',
             'usuario': usuario
-        }
\ No newline at end of file
+        }
+    
+    # Obtener el perfil (dict) de un usuario por su id, usando la cache
+    # Retorna None si no existe
+    @staticmethod
+    def obtener_perfil(usuario_id):
+        encontrado, perfil = cache_usuarios.obtener(usuario_id)
+        if encontrado:
+            return perfil
+        
+        # SELECT * FROM usuarios WHERE id = ?
+        usuario = db.session.get(Usuario, usuario_id)
+        perfil = usuario.to_dict() if usuario else None
+        
+        cache_usuarios.guardar(usuario_id, perfil)
+        return perfil
+    
+    # Perfil para /me a partir de los claims del JWT
+    # Los claims valen si su 'version' es la actual del usuario; la versión actual sale
+    # de la cache y, si no está o no coincide con el token, de la BD (una consulta)
+    # Así, si otro worker modificó el usuario, esta cache no sirve un perfil viejo
+    # a un token nuevo. Si el token es anterior al último cambio, se usa el perfil de la BD
+    # Retorna None si el usuario ya no existe
+    @staticmethod
+    def perfil_desde_claims(usuario_id, claims):
+        version = claims.get('version')
+        
+        encontrado, perfil = cache_usuarios.obtener(usuario_id)
+        if encontrado and perfil is not None and perfil['actualizado_en'].isoformat() != version:
+            cache_usuarios.invalidar(usuario_id)
+            encontrado = False
+        if not encontrado:
+            perfil = AuthService.obtener_perfil(usuario_id)
+        
+        if perfil is None or perfil['actualizado_en'].isoformat() != version:
+            return perfil
+        
+        return {
+            'id': usuario_id,
+            'nombre_usuario': claims['nombre_usuario'],
+            'creado_en': claims['creado_en'],
+            'actualizado_en': version,
+        }
+    
+    # Claims extra que van dentro del JWT (datos no sensibles del perfil)
+    # 'version' cambia cada vez que se modifica el usuario
+    @staticmethod
+    def claims_usuario(usuario):
+        return {
+            'nombre_usuario': usuario.nombre_usuario,
+            'creado_en': usuario.creado_en.isoformat(),
+            'version': usuario.actualizado_en.isoformat(),
+        }
+
+
+# Si un usuario cambia o se borra, su perfil cacheado deja de valer
+@event.listens_for(Usuario, 'after_update')
+@event.listens_for(Usuario, 'after_delete')
+def _invalidar_usuario(mapper, connection, usuario):
+    cache_usuarios.invalidar(usuario.id)
@@ -2,28 +2,52 @@ from app.database import db
 from datetime import datetime
 from sqlalchemy import TIME
 
-# Modelo Negocio: información general + horarios por día
-# Una fila por día de la semana (7 filas totales)
+# Modelo Negocio: información general y configuración de turnos
+# Una sola fila para todo el negocio
 class Negocio(db.Model):
     __tablename__ = 'negocio'
     
-    # ID único de cada registro
+    # ID único del registro
     id = db.Column(db.Integer, primary_key=True)
     
-    # INFORMACIÓN GENERAL (se repite en todos los registros)
+    # INFORMACIÓN GENERAL
     nombre = db.Column(db.String(100), nullable=False)
     telefono = db.Column(db.String(30))
     email = db.Column(db.String(100))
     direccion = db.Column(db.String(200))
     
-    # CONFIGURACIÓN GENERAL (se repite en todos los registros)
+    # CONFIGURACIÓN GENERAL
     duracion_turno = db.Column(db.Integer, default=60)  # En minutos
     intervalo_turnos = db.Column(db.Integer, default=30)  # En minutos
     max_turnos = db.Column(db.Integer, default=20)
     
-    # HORARIOS ESPECÍFICOS POR DÍA
-    # Día de la semana (0 = lunes, 6 = domingo, NULL = no configurado)
-    dia_semana = db.Column(db.Integer)
+    # Timestamps
+    creado_en = db.Column(db.DateTime, default=datetime.utcnow)
+    actualizado_en = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Convertir a diccionario para JSON (solo la configuración general)
+    def to_dict(self):
+        return {
+            'nombre': self.nombre,
+            'telefono': self.telefono,
+            'email': self.email,
+            'direccion': self.direccion,
+            'duracion_turno': self.duracion_turno,
+            'intervalo_turnos': self.intervalo_turnos,
+            'max_turnos': self.max_turnos,
+        }
+
+
+# Modelo HorarioNegocio: horario de atención de un día de la semana
+# Una fila por día de la semana (7 filas totales)
+class HorarioNegocio(db.Model):
+    __tablename__ = 'horarios_negocio'
+    
+    # ID único de cada registro
+    id = db.Column(db.Integer, primary_key=True)
+    
+    # Día de la semana (0 = lunes, 6 = domingo)
+    dia_semana = db.Column(db.Integer, unique=True, nullable=False)
     
     # Horarios en formato TIME
     hora_apertura = db.Column(TIME)
@@ -37,24 +61,25 @@ class Negocio(db.Model):
     # Timestamps
     creado_en = db.Column(db.DateTime, default=datetime.utcnow)
     actualizado_en = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-
+    
     # Convertir a diccionario para JSON
-    def to_dict(self):
+    # Incluye la configuración general del negocio (mismo formato que cuando
+    # todo estaba en una fila por día)
+    def to_dict(self, negocio=None):
+        general = negocio.to_dict() if negocio else dict.fromkeys([
+            'nombre', 'telefono', 'email', 'direccion',
+            'duracion_turno', 'intervalo_turnos', 'max_turnos',
+        ])
+        
         return {
             'id': self.id,
-            'nombre': self.nombre,
-            'telefono': self.telefono,
-            'email': self.email,
-            'direccion': self.direccion,
-            'duracion_turno': self.duracion_turno,
-            'intervalo_turnos': self.intervalo_turnos,
-            'max_turnos': self.max_turnos,
+            **general,
             'dia_semana': self.dia_semana,
-            'hora_apertura': str(self.hora_apertura) if self.hora_apertura else None,
-            'hora_cierre': str(self.hora_cierre) if self.hora_cierre else None,
-            'hora_descanso_inicio': str(self.hora_descanso_inicio) if self.hora_descanso_inicio else None,
-            'hora_descanso_fin': str(self.hora_descanso_fin) if self.hora_descanso_fin else None,
+            'hora_apertura': self.hora_apertura,
+            'hora_cierre': self.hora_cierre,
+            'hora_descanso_inicio': self.hora_descanso_inicio,
+            'hora_descanso_fin': self.hora_descanso_fin,
             'abierto': self.abierto,
-            'creado_en': self.creado_en.isoformat() if self.creado_en else None,
-            'actualizado_en': self.actualizado_en.isoformat() if self.actualizado_en else None,
+            'creado_en': self.creado_en,
+            'actualizado_en': self.actualizado_en,
         }
\ No newline at end of file
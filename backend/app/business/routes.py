@@ -1,14 +1,46 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, make_response
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.business.service import NegocioService
+from app.presupuesto_consultas import presupuesto_consultas
+import hashlib
 
 # Creamos un Blueprint para las rutas de negocio
 business_bp = Blueprint('business', __name__, url_prefix='/api/business')
 
+# El navegador puede guardar la respuesta, pero tiene que revalidarla con el ETag
+CACHE_CONTROL = 'public, no-cache'
+
+# Generar un ETag fuerte para un recurso a partir de la versión de la configuración
+def _generar_etag(recurso):
+    version = NegocioService.obtener_version_configuracion()
+    return hashlib.sha1(f'{recurso}:{version}'.encode()).hexdigest()
+
+# Si el cliente ya tiene la versión actual, respondemos 304 sin serializar nada
+# (comparación débil: las respuestas comprimidas llevan el ETag como W/"...")
+def _no_modificado(etag):
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    
+    response = make_response('', 304)
+    return _con_cache(response, etag)
+
+# Agregar los headers de cache (ETag + Cache-Control) a una respuesta
+def _con_cache(response, etag):
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
+
 # Ruta GET /api/business/config
 # Obtener configuración general del negocio
 @business_bp.route('/config', methods=['GET'])
+@presupuesto_consultas(2)
 def obtener_configuracion():
+    # Si el cliente ya tiene esta versión, no hace falta volver a mandarla
+    etag = _generar_etag('config')
+    no_modificado = _no_modificado(etag)
+    if no_modificado:
+        return no_modificado
+    
     # Llamamos al servicio para obtener la configuración
     config = NegocioService.obtener_configuracion()
     
@@ -19,32 +51,39 @@ def obtener_configuracion():
         }), 404
     
     # Retornamos la configuración
-    return jsonify({
+    response = jsonify({
         'success': True,
         'configuracion': config
-    }), 200
+    })
+    return _con_cache(response, etag), 200
 
 # Ruta GET /api/business/horarios
 # Obtener todos los horarios de la semana
 @business_bp.route('/horarios', methods=['GET'])
+@presupuesto_consultas(3)
 def obtener_horarios():
-    # Llamamos al servicio para obtener todos los horarios
-    horarios = NegocioService.obtener_todos_horarios()
+    # Si el cliente ya tiene esta versión, no hace falta volver a mandarla
+    etag = _generar_etag('horarios')
+    no_modificado = _no_modificado(etag)
+    if no_modificado:
+        return no_modificado
     
-    # Convertimos a lista de dicts
-    horarios_dict = [h.to_dict() for h in horarios]
+    # Llamamos al servicio para obtener todos los horarios (como lista de dicts)
+    horarios_dict = NegocioService.obtener_horarios_dict()
     
     # Retornamos los horarios
-    return jsonify({
+    response = jsonify({
         'success': True,
         'horarios': horarios_dict
-    }), 200
+    })
+    return _con_cache(response, etag), 200
 
 # Ruta POST /api/business/config
 # Guardar configuración completa (general + horarios)
 # Body: nombre, telefono, email, direccion, duracion_turno, intervalo_turnos, max_turnos, horarios
 @business_bp.route('/config', methods=['POST'])
 @jwt_required()
+@presupuesto_consultas(10)
 def guardar_configuracion():
     # Obtenemos los datos del request
     data = request.get_json()
@@ -64,27 +103,36 @@ def guardar_configuracion():
 # Ruta GET /api/business/horarios/<int:dia_semana>
 # Obtener horario de un día específico
 @business_bp.route('/horarios/<int:dia_semana>', methods=['GET'])
+@presupuesto_consultas(3)
 def obtener_horario_dia(dia_semana):
     # Validamos que el día esté entre 0 y 6
     if dia_semana < 0 or dia_semana > 6:
         return jsonify({'error': 'Día inválido (debe ser 0-6)'}), 400
     
+    # Si el cliente ya tiene esta versión, no hace falta volver a mandarla
+    etag = _generar_etag(f'horarios/{dia_semana}')
+    no_modificado = _no_modificado(etag)
+    if no_modificado:
+        return no_modificado
+    
     # Buscamos el horario para ese día
-    horario = NegocioService.obtener_horario_por_dia(dia_semana)
+    horario = NegocioService.obtener_horario_dict(dia_semana)
     
     # Si no existe, retornamos 404
     if not horario:
         return jsonify({'error': 'No hay horario para ese día'}), 404
     
     # Retornamos el horario
-    return jsonify({
+    response = jsonify({
         'success': True,
-        'horario': horario.to_dict()
-    }), 200
+        'horario': horario
+    })
+    return _con_cache(response, etag), 200
 
 # Ruta GET /api/business/abierto-hoy
 # Verificar si el negocio está abierto hoy
 @business_bp.route('/abierto-hoy', methods=['GET'])
+@presupuesto_consultas(1)
 def esta_abierto_hoy():
     # Verificamos si está abierto
     abierto = NegocioService.esta_abierto_hoy()
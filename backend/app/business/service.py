@@ -1,42 +1,64 @@
-from app.business.models import Negocio
+from app.business.models import Negocio, HorarioNegocio
 from app.database import db
+from flask import current_app
+from sqlalchemy import func, select
 from datetime import datetime, time, timedelta
+import threading
+import time as reloj
+
+# Cache de plantillas de slots por día de la semana (compartido por todo el proceso)
+# {'slots': {dia_semana: ('HH:MM', ...)}, 'max_turnos': int, 'creado': timestamp}
+# Se reconstruye cuando se guarda la configuración o cuando vence el TTL
+_cache_slots = None
+_cache_slots_lock = threading.Lock()
 
 # Servicio para manejar la lógica de negocio
 class NegocioService:
     
+    # Obtener el registro de configuración general (una sola fila)
+    @staticmethod
+    def obtener_negocio():
+        return Negocio.query.first()
+    
     # Obtener configuración general del negocio
     @staticmethod
     def obtener_configuracion():
-        # Obtenemos el primer registro (tienen todos los mismos datos generales)
-        config = Negocio.query.first()
+        config = NegocioService.obtener_negocio()
         if not config:
             return None
         
-        return {
-            'nombre': config.nombre,
-            'telefono': config.telefono,
-            'email': config.email,
-            'direccion': config.direccion,
-            'duracion_turno': config.duracion_turno,
-            'intervalo_turnos': config.intervalo_turnos,
-            'max_turnos': config.max_turnos,
-        }
+        return config.to_dict()
+    
+    # Obtener la versión actual de la configuración (para ETags)
+    # Cambia cada vez que se modifica la configuración general o algún horario
+    @staticmethod
+    def obtener_version_configuracion():
+        # SELECT (SELECT MAX(actualizado_en) FROM negocio),
+        #        (SELECT MAX(actualizado_en) FROM horarios_negocio),
+        #        (SELECT COUNT(id) FROM horarios_negocio)
+        version = db.session.execute(select(
+            select(func.max(Negocio.actualizado_en)).scalar_subquery(),
+            select(func.max(HorarioNegocio.actualizado_en)).scalar_subquery(),
+            select(func.count(HorarioNegocio.id)).scalar_subquery()
+        )).one()
+        
+        return '-'.join(
+            valor.isoformat() if hasattr(valor, 'isoformat') else str(valor)
+            for valor in version
+        )
     
     # Obtener horario de un día específico
     @staticmethod
     def obtener_horario_por_dia(dia_semana):
         # Buscamos el registro donde dia_semana coincida
-        horario = Negocio.query.filter_by(dia_semana=dia_semana).first()
+        horario = HorarioNegocio.query.filter_by(dia_semana=dia_semana).first()
         return horario
     
     # Obtener todos los horarios de la semana
     @staticmethod
     def obtener_todos_horarios():
-        # SELECT * FROM negocio WHERE dia_semana IS NOT NULL ORDER BY dia_semana
-        horarios = Negocio.query.filter(
-            Negocio.dia_semana.isnot(None)
-        ).order_by(Negocio.dia_semana).all()
+        # SELECT * FROM horarios_negocio ORDER BY dia_semana
+        horarios = HorarioNegocio.query.order_by(HorarioNegocio.dia_semana).all()
         return horarios
     
     # Verificar si está abierto hoy
@@ -57,24 +79,81 @@ class NegocioService:
     # Obtener horarios disponibles para un día
     @staticmethod
     def obtener_horarios_disponibles(dia_semana, duracion_turno=None):
-        # Obtenemos el horario del día
-        horario = NegocioService.obtener_horario_por_dia(dia_semana)
+        # Los slots salen de la plantilla cacheada (no consulta la tabla negocio)
+        return list(NegocioService.obtener_slots_semana()[dia_semana])
+    
+    # Obtener los slots de toda la semana
+    # Retorna un dict {dia_semana: ('HH:MM', ...)} con los 7 días (tupla vacía si está cerrado)
+    @staticmethod
+    def obtener_slots_semana():
+        return NegocioService._obtener_plantillas()['slots']
+    
+    # Obtener el máximo de turnos por día (None si no hay límite configurado)
+    @staticmethod
+    def obtener_max_turnos():
+        return NegocioService._obtener_plantillas()['max_turnos']
+    
+    # Obtener las plantillas cacheadas, reconstruyéndolas si no hay o vencieron
+    @staticmethod
+    def _obtener_plantillas():
+        global _cache_slots
+        
+        ttl = current_app.config.get('SLOTS_CACHE_TTL', 60)
+        cache = _cache_slots
+        
+        # Si la plantilla está vigente, la usamos directamente
+        if cache and reloj.monotonic() - cache['creado'] < ttl:
+            return cache
+        
+        with _cache_slots_lock:
+            # Otro hilo pudo haberla reconstruido mientras esperábamos el lock
+            cache = _cache_slots
+            if cache and reloj.monotonic() - cache['creado'] < ttl:
+                return cache
+            
+            cache = NegocioService.construir_plantillas()
+            cache['creado'] = reloj.monotonic()
+            _cache_slots = cache
+            return cache
+    
+    # Construir las plantillas de slots de la semana
+    # (una consulta a negocio y otra a horarios_negocio)
+    @staticmethod
+    def construir_plantillas():
+        slots_semana = {dia: () for dia in range(7)}
+        negocio = NegocioService.obtener_negocio()
+        
+        if not negocio:
+            return {'slots': slots_semana, 'max_turnos': None}
+        
+        for horario in NegocioService.obtener_todos_horarios():
+            slots_semana[horario.dia_semana] = tuple(
+                NegocioService.generar_slots(horario, negocio.intervalo_turnos or 30)
+            )
         
+        return {'slots': slots_semana, 'max_turnos': negocio.max_turnos}
+    
+    # Invalidar la plantilla de slots (se reconstruye en el próximo pedido)
+    @staticmethod
+    def invalidar_cache_slots():
+        global _cache_slots
+        
+        with _cache_slots_lock:
+            _cache_slots = None
+    
+    # Generar los slots ('HH:MM') de un registro de horario
+    @staticmethod
+    def generar_slots(horario, intervalo):
         # Si está cerrado o no tiene datos, retornamos lista vacía
         if not horario or not horario.abierto or not horario.hora_apertura or not horario.hora_cierre:
             return []
         
-        # Si no especifican duración, usamos la del negocio
-        if duracion_turno is None:
-            duracion_turno = horario.duracion_turno
-        
         # Generamos slots basado en intervalo_turnos (generalmente 30 min)
         slots = []
         
         # Convertimos TIME a datetime para manipular
         apertura = datetime.combine(datetime.today(), horario.hora_apertura)
         cierre = datetime.combine(datetime.today(), horario.hora_cierre)
-        intervalo = horario.intervalo_turnos
         
         current = apertura
         
@@ -122,49 +201,48 @@ class NegocioService:
         # }
         
         try:
-            # Obtener información general
-            nombre = datos.get('nombre')
-            telefono = datos.get('telefono')
-            email = datos.get('email')
-            direccion = datos.get('direccion')
-            duracion_turno = datos.get('duracion_turno', 60)
-            intervalo_turnos = datos.get('intervalo_turnos', 30)
-            max_turnos = datos.get('max_turnos', 20)
+            # Leemos la configuración general y los 7 horarios (dos consultas)
+            # (los horarios antes de agregar un Negocio nuevo, para que el autoflush
+            # no intente insertarlo vacío)
+            negocio = NegocioService.obtener_negocio()
+            horarios = {h.dia_semana: h for h in NegocioService.obtener_todos_horarios()}
+            
+            if not negocio:
+                negocio = Negocio()
+                db.session.add(negocio)
+            
+            # Actualizamos la información general (una sola fila)
+            negocio.nombre = datos.get('nombre')
+            negocio.telefono = datos.get('telefono')
+            negocio.email = datos.get('email')
+            negocio.direccion = datos.get('direccion')
+            negocio.duracion_turno = datos.get('duracion_turno', 60)
+            negocio.intervalo_turnos = datos.get('intervalo_turnos', 30)
+            negocio.max_turnos = datos.get('max_turnos', 20)
             
             # Actualizar cada día
             for horario_data in datos.get('horarios', []):
-                # Buscamos si existe el registro para ese día
-                negocio = Negocio.query.filter_by(
-                    dia_semana=horario_data['dia_semana']
-                ).first()
+                horario = horarios.get(horario_data['dia_semana'])
                 
                 # Si no existe, creamos uno nuevo
-                if not negocio:
-                    negocio = Negocio()
-                
-                # Actualizamos los datos generales (se repiten en todos los registros)
-                negocio.nombre = nombre
-                negocio.telefono = telefono
-                negocio.email = email
-                negocio.direccion = direccion
-                negocio.duracion_turno = duracion_turno
-                negocio.intervalo_turnos = intervalo_turnos
-                negocio.max_turnos = max_turnos
+                if not horario:
+                    horario = HorarioNegocio(dia_semana=horario_data['dia_semana'])
+                    horarios[horario.dia_semana] = horario
+                    db.session.add(horario)
                 
                 # Actualizamos datos específicos del día
-                negocio.dia_semana = horario_data['dia_semana']
-                negocio.abierto = horario_data.get('abierto', True)
-                negocio.hora_apertura = horario_data.get('hora_apertura')
-                negocio.hora_cierre = horario_data.get('hora_cierre')
-                negocio.hora_descanso_inicio = horario_data.get('hora_descanso_inicio')
-                negocio.hora_descanso_fin = horario_data.get('hora_descanso_fin')
-                
-                # Agregamos a la sesión
-                db.session.add(negocio)
+                horario.abierto = horario_data.get('abierto', True)
+                horario.hora_apertura = NegocioService._a_hora(horario_data.get('hora_apertura'))
+                horario.hora_cierre = NegocioService._a_hora(horario_data.get('hora_cierre'))
+                horario.hora_descanso_inicio = NegocioService._a_hora(horario_data.get('hora_descanso_inicio'))
+                horario.hora_descanso_fin = NegocioService._a_hora(horario_data.get('hora_descanso_fin'))
             
-            # Guardamos todos los cambios
+            # Guardamos todos los cambios (un solo flush con todas las filas)
             db.session.commit()
             
+            # Los horarios cambiaron: invalidamos la plantilla de slots
+            NegocioService.invalidar_cache_slots()
+            
             return {
                 'success': True,
                 'mensaje': 'Configuración guardada correctamente'
@@ -177,8 +255,28 @@ class NegocioService:
                 'mensaje': f'Error al guardar configuración: {str(e)}'
             }
     
+    # Convertir 'HH:MM' / 'HH:MM:SS' a objeto time (vacío = None)
+    @staticmethod
+    def _a_hora(valor):
+        if not valor:
+            return None
+        if isinstance(valor, time):
+            return valor
+        return time.fromisoformat(valor)
+    
     # Obtener horarios en formato dict (para devolver al frontend)
+    # Cada horario incluye la configuración general del negocio
     @staticmethod
     def obtener_horarios_dict():
+        negocio = NegocioService.obtener_negocio()
         horarios = NegocioService.obtener_todos_horarios()
-        return [h.to_dict() for h in horarios]
\ No newline at end of file
+        return [h.to_dict(negocio) for h in horarios]
+    
+    # Obtener el horario de un día en formato dict (None si no existe)
+    @staticmethod
+    def obtener_horario_dict(dia_semana):
+        horario = NegocioService.obtener_horario_por_dia(dia_semana)
+        if not horario:
+            return None
+        
+        return horario.to_dict(NegocioService.obtener_negocio())
\ No newline at end of file
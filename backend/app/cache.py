@@ -0,0 +1,68 @@
+from collections import OrderedDict
+import threading
+import time
+
+# Cache en memoria con vencimiento (TTL) y tamaño máximo
+# Cuando se llena, descarta la entrada usada hace más tiempo (LRU)
+# Es por proceso: cada worker tiene la suya
+class CacheTTL:
+    
+    def __init__(self, maximo=1000, ttl=30):
+        self.maximo = maximo
+        self.ttl = ttl
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+        
+        # Contadores para saber si la cache sirve
+        self.aciertos = 0
+        self.fallos = 0
+    
+    # Buscar una clave
+    # Retorna (True, valor) si está y no venció, (False, None) si no
+    # (así se puede cachear None como valor, ej: "no tiene turno")
+    def obtener(self, clave):
+        with self._lock:
+            entrada = self._datos.get(clave)
+            
+            if entrada is None or entrada[1] < time.monotonic():
+                if entrada is not None:
+                    del self._datos[clave]
+                self.fallos += 1
+                return False, None
+            
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return True, entrada[0]
+    
+    # Guardar un valor (reemplaza el anterior si existía)
+    def guardar(self, clave, valor):
+        with self._lock:
+            self._datos[clave] = (valor, time.monotonic() + self.ttl)
+            self._datos.move_to_end(clave)
+            
+            # Si nos pasamos del máximo, descartamos las más viejas
+            while len(self._datos) > self.maximo:
+                self._datos.popitem(last=False)
+    
+    # Borrar una clave (cuando el dato cambió)
+    def invalidar(self, clave):
+        with self._lock:
+            self._datos.pop(clave, None)
+    
+    # Borrar todo
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+    
+    # Estado de la cache (para monitoreo)
+    def estadisticas(self):
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                'entradas': len(self._datos),
+                'maximo': self.maximo,
+                'ttl': self.ttl,
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'tasa_aciertos': round(self.aciertos / consultas, 4) if consultas else 0.0,
+            }
@@ -0,0 +1,104 @@
+import gzip
+import zlib
+from flask import request
+
+# brotli es opcional: si está instalado se ofrece "br" (comprime más que gzip)
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# Tipos de contenido que vale la pena comprimir (texto repetitivo)
+TIPOS_COMPRIMIBLES = ('application/json', 'application/x-ndjson', 'text/csv')
+
+
+# Elegir la codificación según el header Accept-Encoding del cliente
+# Preferimos br si está disponible; se respetan los q=0 ("no me mandes esto")
+def elegir_codificacion(accept_encoding):
+    if brotli is not None and accept_encoding.quality('br') > 0:
+        return 'br'
+    if accept_encoding.quality('gzip') > 0:
+        return 'gzip'
+    return None
+
+
+# Comprimir un cuerpo completo de una vez
+def comprimir(datos, codificacion, nivel_gzip, nivel_brotli):
+    if codificacion == 'br':
+        return brotli.compress(datos, quality=nivel_brotli)
+    return gzip.compress(datos, compresslevel=nivel_gzip, mtime=0)
+
+
+# Comprimir un cuerpo que se genera de a partes (streaming)
+# Cada parte se manda apenas está comprimida, así el cliente no espera al final
+def comprimir_stream(partes, codificacion, nivel_gzip, nivel_brotli):
+    if codificacion == 'br':
+        compresor = brotli.Compressor(quality=nivel_brotli)
+        vaciar = compresor.flush
+        terminar = compresor.finish
+        agregar = compresor.process
+    else:
+        compresor = zlib.compressobj(nivel_gzip, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # formato gzip
+        vaciar = lambda: compresor.flush(zlib.Z_SYNC_FLUSH)
+        terminar = compresor.flush
+        agregar = compresor.compress
+    
+    try:
+        for parte in partes:
+            if isinstance(parte, str):
+                parte = parte.encode()
+            if parte:
+                yield agregar(parte) + vaciar()
+        yield terminar()
+    finally:
+        # Cerrar el generador original (libera la conexión a la BD del export)
+        if hasattr(partes, 'close'):
+            partes.close()
+
+
+# Registrar la compresión en la app (after_request)
+# Se configura con COMPRESION_NIVEL, COMPRESION_NIVEL_BROTLI y COMPRESION_MINIMO
+def registrar_compresion(app):
+
+    @app.after_request
+    def _comprimir_respuesta(response):
+        if response.mimetype not in TIPOS_COMPRIMIBLES:
+            return response
+        
+        # Aunque no se comprima esta vez, la respuesta depende de Accept-Encoding
+        response.vary.add('Accept-Encoding')
+        
+        if (
+            not app.config['COMPRESION_ACTIVA']
+            or response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or 'Content-Encoding' in response.headers
+        ):
+            return response
+        
+        codificacion = elegir_codificacion(request.accept_encodings)
+        if codificacion is None:
+            return response
+        
+        nivel_gzip = app.config['COMPRESION_NIVEL']
+        nivel_brotli = app.config['COMPRESION_NIVEL_BROTLI']
+        
+        if response.is_streamed:
+            # No sabemos el tamaño final: se comprime siempre
+            response.response = comprimir_stream(response.response, codificacion, nivel_gzip, nivel_brotli)
+            response.headers.pop('Content-Length', None)
+        else:
+            datos = response.get_data()
+            if len(datos) < app.config['COMPRESION_MINIMO']:
+                return response
+            response.set_data(comprimir(datos, codificacion, nivel_gzip, nivel_brotli))
+        
+        response.headers['Content-Encoding'] = codificacion
+        
+        # El cuerpo cambió: el ETag pasa a ser débil (sigue sirviendo para el 304)
+        etag, debil = response.get_etag()
+        if etag and not debil:
+            response.set_etag(etag, weak=True)
+        
+        return response
@@ -4,13 +4,78 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+
+# Opciones del engine de SQLAlchemy (pool de conexiones) desde variables de entorno
+# SQLite no usa un pool de red: solo se le aplica pre_ping y recycle
+def _opciones_engine(url):
+    opciones = {
+        # Probar la conexión antes de usarla (evita errores por conexiones cortadas)
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', '1').lower() in ('1', 'true', 'yes'),
+        # Renovar las conexiones cada tantos segundos (antes de que las corte el servidor)
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+    }
+    
+    if not url or url.startswith('sqlite'):
+        return opciones
+    
+    opciones.update({
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 30)),
+    })
+    
+    # Tiempo máximo por consulta en Postgres (0 = sin límite)
+    timeout_consulta = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 0))
+    if timeout_consulta and url.startswith('postgres'):
+        opciones['connect_args'] = {'options': f'-c statement_timeout={timeout_consulta}'}
+    
+    return opciones
+
+
 class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL')
+    SQLALCHEMY_ENGINE_OPTIONS = _opciones_engine(SQLALCHEMY_DATABASE_URI)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = False
     
+    # Aplicar las migraciones pendientes al crear la app (por defecto no: "flask db upgrade")
+    MIGRAR_AL_ARRANCAR = os.getenv('DB_MIGRAR_AL_ARRANCAR', '0').lower() in ('1', 'true', 'yes')
+    
+    # Modo debug (debugger + recarga automática): solo para desarrollo
+    # En producción se deja apagado y se sirve con gunicorn (wsgi.py)
+    DEBUG = os.getenv('FLASK_DEBUG', '0').lower() in ('1', 'true', 'yes')
+    
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'clave-default-cambiar-en-produccion')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
     JWT_TOKEN_LOCATION = ['headers']
     JWT_HEADER_NAME = 'Authorization'
-    JWT_HEADER_TYPE = 'Bearer'
\ No newline at end of file
+    JWT_HEADER_TYPE = 'Bearer'
+    
+    # Segundos que dura la plantilla de slots en memoria (cada worker tiene la suya)
+    SLOTS_CACHE_TTL = int(os.getenv('SLOTS_CACHE_TTL', 60))
+    
+    # Cache de turno activo por client_id (/turno-actual y validación al reservar)
+    TURNO_ACTIVO_CACHE_TTL = int(os.getenv('TURNO_ACTIVO_CACHE_TTL', 30))
+    TURNO_ACTIVO_CACHE_MAX = int(os.getenv('TURNO_ACTIVO_CACHE_MAX', 10000))
+    
+    # Cache de perfiles de usuario por id (/api/auth/me)
+    USUARIO_CACHE_TTL = int(os.getenv('USUARIO_CACHE_TTL', 300))
+    USUARIO_CACHE_MAX = int(os.getenv('USUARIO_CACHE_MAX', 1000))
+    
+    # Loguear cuando conseguir una conexión del pool tarda más que esto (milisegundos)
+    DB_POOL_LOG_ESPERA_MS = int(os.getenv('DB_POOL_LOG_ESPERA_MS', 100))
+    
+    # Compresión de respuestas JSON / CSV (gzip, o brotli si está instalado)
+    COMPRESION_ACTIVA = os.getenv('COMPRESION_ACTIVA', '1').lower() in ('1', 'true', 'yes')
+    COMPRESION_NIVEL = int(os.getenv('COMPRESION_NIVEL', 6))  # gzip: 1 (rápido) a 9 (más chico)
+    COMPRESION_NIVEL_BROTLI = int(os.getenv('COMPRESION_NIVEL_BROTLI', 4))  # brotli: 0 a 11
+    COMPRESION_MINIMO = int(os.getenv('COMPRESION_MINIMO', 1024))  # bytes; las respuestas chicas no se comprimen
+    
+    # Métricas por endpoint (latencia, códigos, consultas SQL) en /metrics, formato Prometheus
+    METRICAS_ACTIVAS = os.getenv('METRICAS_ACTIVAS', '1').lower() in ('1', 'true', 'yes')
+    METRICAS_TOKEN = os.getenv('METRICAS_TOKEN')  # token fijo para Prometheus (si no, hace falta un JWT)
+    
+    # Control de consultas por request (desarrollo / tests): presupuesto por vista y posibles N+1
+    PRESUPUESTO_CONSULTAS_ACTIVO = os.getenv('PRESUPUESTO_CONSULTAS_ACTIVO', '0').lower() in ('1', 'true', 'yes')
+    PRESUPUESTO_CONSULTAS_MODO = os.getenv('PRESUPUESTO_CONSULTAS_MODO', 'advertir')  # advertir / fallar
+    CONSULTAS_REPETIDAS_MAX = int(os.getenv('CONSULTAS_REPETIDAS_MAX', 3))
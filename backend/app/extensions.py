@@ -1,3 +1,11 @@
 from flask_jwt_extended import JWTManager
 
-jwt = JWTManager()
\ No newline at end of file
+jwt = JWTManager()
+
+
+# Migraciones del esquema (comandos "flask db ...")
+# Flask-Migrate importa Alembic, que tarda en cargar: solo se inicializa cuando hace falta
+def iniciar_migraciones(app, db):
+    from flask_migrate import Migrate
+    
+    Migrate(app, db)
@@ -0,0 +1,53 @@
+import decimal
+from datetime import date, time
+from flask.json.provider import DefaultJSONProvider, _default
+
+# orjson es opcional: si está instalado se usa para serializar (mucho más rápido)
+# Si no, se usa el json de la librería estándar con las mismas conversiones
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Tipos que json no sabe convertir
+# Fechas y horas en ISO 8601 (no en el formato HTTP que usa Flask por defecto)
+# Decimal (ej: Servicio.precio) como número
+def _valor_json(valor):
+    if isinstance(valor, (date, time)):
+        return valor.isoformat()
+    if isinstance(valor, decimal.Decimal):
+        return float(valor)
+    return _default(valor)
+
+
+# Proveedor JSON de la app (jsonify, request.get_json, etc.)
+class ProveedorJSON(DefaultJSONProvider):
+    default = staticmethod(_valor_json)
+    ensure_ascii = False
+    sort_keys = False
+    
+    # Opciones de orjson: permitir claves que no son texto (como hace json)
+    OPCIONES_ORJSON = orjson.OPT_NON_STR_KEYS if orjson else 0
+    
+    # Serializar a texto
+    # Con argumentos extra (indent, separators...) se usa json para respetarlos
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.OPCIONES_ORJSON).decode()
+    
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+    
+    # Armar la respuesta de jsonify
+    # Con orjson se arma directo en bytes (sin pasar por str); en debug queda indentado
+    def response(self, *args, **kwargs):
+        if orjson is None or self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+        
+        obj = self._prepare_response_obj(args, kwargs)
+        cuerpo = orjson.dumps(obj, default=self.default, option=self.OPCIONES_ORJSON | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(cuerpo, mimetype=self.mimetype)
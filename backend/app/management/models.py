@@ -7,15 +7,16 @@ class GestionTurnos(db.Model):
     __tablename__ = 'turnos'
     __table_args__ = {'extend_existing': True}  # ← ESTA LÍNEA SOLUCIONA EL PROBLEMA
     
+    # Las columnas tienen que coincidir con las de Turno (misma tabla, extend_existing)
     id = db.Column(db.Integer, primary_key=True)
     fecha = db.Column(Date, nullable=False)
     hora = db.Column(Time, nullable=False)
     servicio_id = db.Column(db.Integer, ForeignKey('servicios.id'), nullable=False)
-    nombre_cliente = db.Column(db.String(100), nullable=False)
-    telefono_cliente = db.Column(db.String(20), nullable=False)
-    client_id = db.Column(db.String(50))
-    estado = db.Column(db.String(20), default='pendiente')  # pendiente, confirmado, completado, cancelado
-    token_cancelacion = db.Column(db.String(100))
+    nombre_cliente = db.Column(db.String(120), nullable=False)
+    telefono_cliente = db.Column(db.String(30), nullable=False)
+    client_id = db.Column(db.String(100), nullable=False)
+    estado = db.Column(db.String(20), nullable=False, default='reservado')  # reservado, completado, cancelado, no-show
+    token_hash = db.Column(db.String(64), unique=True, nullable=False)
     creado_en = db.Column(db.DateTime, default=datetime.utcnow)
     actualizado_en = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -25,17 +26,39 @@ class GestionTurnos(db.Model):
     def to_dict(self):
         return {
             'id': self.id,
-            'fecha': self.fecha.isoformat() if self.fecha else None,
-            'hora': str(self.hora) if self.hora else None,
+            'fecha': self.fecha,
+            'hora': self.hora,
             'servicio_id': self.servicio_id,
             'nombre_servicio': self.servicio.nombre_servicio if self.servicio else '',
             'categoria_servicio': self.servicio.categoria if self.servicio else '',
-            'precio_servicio': float(self.servicio.precio) if self.servicio and self.servicio.precio else 0.0,
+            'precio_servicio': self.servicio.precio if self.servicio else 0.0,
             'nombre_cliente': self.nombre_cliente,
             'telefono_cliente': self.telefono_cliente,
             'client_id': self.client_id,
             'estado': self.estado,
-            'token_cancelacion': self.token_cancelacion,
-            'creado_en': self.creado_en.isoformat() if self.creado_en else None,
-            'actualizado_en': self.actualizado_en.isoformat() if self.actualizado_en else None,
-        }
\ No newline at end of file
+            'creado_en': self.creado_en,
+            'actualizado_en': self.actualizado_en,
+        }
+
+# Turnos archivados (tabla turnos_historico), con el mismo to_dict que GestionTurnos
+class GestionTurnosHistorico(db.Model):
+    __tablename__ = 'turnos_historico'
+    __table_args__ = {'extend_existing': True}
+    
+    # Las columnas tienen que coincidir con las de TurnoHistorico (misma tabla, extend_existing)
+    historico_id = db.Column('id', db.Integer, primary_key=True)
+    id = db.Column('turno_id', db.Integer, nullable=False)  # id que tenía en turnos
+    fecha = db.Column(Date, nullable=False)
+    hora = db.Column(Time, nullable=False)
+    servicio_id = db.Column(db.Integer, ForeignKey('servicios.id'), nullable=False)
+    nombre_cliente = db.Column(db.String(120), nullable=False)
+    telefono_cliente = db.Column(db.String(30), nullable=False)
+    client_id = db.Column(db.String(100), nullable=False)
+    estado = db.Column(db.String(20), nullable=False)
+    creado_en = db.Column(db.DateTime)
+    actualizado_en = db.Column(db.DateTime)
+    archivado_en = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    servicio = relationship('Servicio')
+    
+    to_dict = GestionTurnos.to_dict
@@ -1,28 +1,73 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.management.service import GestionTurnosService
+from app.management.service import GestionTurnosService, LIMITE_POR_DEFECTO, LIMITE_MAXIMO, COLUMNAS_EXPORT, ESTADOS_FINALES
+from app.presupuesto_consultas import presupuesto_consultas
+from datetime import date, datetime, time
+import csv
+import io
 
 # Creamos un Blueprint para las rutas de gestión de turnos
 management_bp = Blueprint('management', __name__, url_prefix='/api/management')
 
-# Obtener todos los turnos (con filtro opcional por fecha)
+# Obtener los turnos paginados (con filtros opcionales)
+# Query params: fecha, estado, desde, hasta, servicio_id, limit, cursor,
+#               historico (1 = incluir los turnos archivados)
 @management_bp.route('/turnos', methods=['GET'])
 @jwt_required()
+@presupuesto_consultas(2)  # 1 sin historico
 def obtener_turnos():
-    fecha_filtro = request.args.get('fecha')
+    estado = request.args.get('estado')
+    servicio_id = request.args.get('servicio_id', type=int)
+    historico = _incluir_historico()
     
-    turnos = GestionTurnosService.obtener_todos_turnos(fecha_filtro)
+    try:
+        fecha_filtro = request.args.get('fecha')
+        desde = request.args.get('desde')
+        hasta = request.args.get('hasta')
+        fecha_filtro = datetime.strptime(fecha_filtro, '%Y-%m-%d').date() if fecha_filtro else None
+        desde = datetime.strptime(desde, '%Y-%m-%d').date() if desde else None
+        hasta = datetime.strptime(hasta, '%Y-%m-%d').date() if hasta else None
+    except ValueError:
+        return jsonify({'success': False, 'mensaje': 'Formato de fecha inválido (YYYY-MM-DD)'}), 400
+    
+    try:
+        cursor = request.args.get('cursor')
+        cursor = GestionTurnosService.decodificar_cursor(cursor) if cursor else None
+    except ValueError as e:
+        return jsonify({'success': False, 'mensaje': str(e)}), 400
+    
+    # Limitamos el tamaño de página
+    limite = request.args.get('limit', LIMITE_POR_DEFECTO, type=int)
+    limite = max(1, min(limite, LIMITE_MAXIMO))
+    
+    turnos, siguiente_cursor = GestionTurnosService.obtener_todos_turnos(
+        fecha_filtro,
+        estado=estado,
+        desde=desde,
+        hasta=hasta,
+        servicio_id=servicio_id,
+        cursor=cursor,
+        limite=limite,
+        historico=historico
+    )
     turnos_dict = [t.to_dict() for t in turnos]
     
     return jsonify({
         'success': True,
         'turnos': turnos_dict,
-        'total': len(turnos_dict)
+        'total': len(turnos_dict),
+        'limit': limite,
+        'next_cursor': siguiente_cursor
     }), 200
 
+# ¿Pidieron incluir los turnos archivados? (?historico=1 o ?historico=true)
+def _incluir_historico():
+    return request.args.get('historico', '').lower() in ('1', 'true')
+
 # Obtener turnos de hoy
 @management_bp.route('/turnos/hoy', methods=['GET'])
 @jwt_required()
+@presupuesto_consultas(1)
 def obtener_turnos_hoy():
     turnos = GestionTurnosService.obtener_turnos_hoy()
     turnos_dict = [t.to_dict() for t in turnos]
@@ -33,18 +78,143 @@ def obtener_turnos_hoy():
         'total': len(turnos_dict)
     }), 200
 
+# Exportar turnos de un rango de fechas (CSV o NDJSON) como stream
+# Query params: desde, hasta (YYYY-MM-DD), formato (csv | ndjson),
+#               historico (1 = incluir los turnos archivados)
+# Las filas se van mandando a medida que salen de la BD, sin armar todo en memoria
+@management_bp.route('/turnos/export', methods=['GET'])
+@jwt_required()
+def exportar_turnos():
+    desde = request.args.get('desde')
+    hasta = request.args.get('hasta')
+    formato = request.args.get('formato', 'csv')
+    
+    if not desde or not hasta:
+        return jsonify({'success': False, 'mensaje': 'Faltan desde y hasta'}), 400
+    
+    if formato not in ('csv', 'ndjson'):
+        return jsonify({'success': False, 'mensaje': 'Formato inválido (csv o ndjson)'}), 400
+    
+    try:
+        inicio = datetime.strptime(desde, '%Y-%m-%d').date()
+        fin = datetime.strptime(hasta, '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({'success': False, 'mensaje': 'Formato de fecha inválido (YYYY-MM-DD)'}), 400
+    
+    tandas = GestionTurnosService.exportar_turnos(inicio, fin, historico=_incluir_historico())
+    
+    if formato == 'csv':
+        generador = _generar_csv(tandas)
+        mimetype = 'text/csv'
+    else:
+        generador = _generar_ndjson(tandas)
+        mimetype = 'application/x-ndjson'
+    
+    response = Response(stream_with_context(generador), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=turnos_{desde}_{hasta}.{formato}'
+    return response
+
+# Generar el CSV de a tandas (primero la fila de encabezados)
+def _generar_csv(tandas):
+    buffer = io.StringIO()
+    escritor = csv.DictWriter(buffer, fieldnames=COLUMNAS_EXPORT)
+    escritor.writeheader()
+    yield buffer.getvalue()
+    
+    for tanda in tandas:
+        buffer.seek(0)
+        buffer.truncate()
+        escritor.writerows(_fila_csv(fila) for fila in tanda)
+        yield buffer.getvalue()
+
+# Fechas y horas en ISO 8601, como en el JSON de la API (csv usaría str(): "2026-01-01 10:00:00")
+def _fila_csv(fila):
+    return {
+        columna: valor.isoformat() if isinstance(valor, (date, time)) else valor
+        for columna, valor in fila.items()
+    }
+
+# Generar NDJSON (un objeto JSON por línea) de a tandas
+# Cada fila se serializa con el proveedor JSON de la app, igual que el resto de la API
+def _generar_ndjson(tandas):
+    for tanda in tandas:
+        yield ''.join(current_app.json.dumps(fila) + '\n' for fila in tanda)
+
 # Marcar turno como completado
 @management_bp.route('/turnos/<int:turno_id>/completar', methods=['PUT'])
 @jwt_required()
+@presupuesto_consultas(3)
 def completar_turno(turno_id):
     resultado = GestionTurnosService.marcar_como_completado(turno_id)
     status_code = 200 if resultado['success'] else 400
     return jsonify(resultado), status_code
 
+# Cambiar el estado de muchos turnos a la vez (ej: cerrar el día)
+# Body: estado (completado | cancelado | no-show) y
+#       ids: [1, 2, ...]  o  fecha: YYYY-MM-DD (+ filtro_estado opcional, ej: reservado)
+@management_bp.route('/turnos/estado', methods=['PUT'])
+@jwt_required()
+@presupuesto_consultas(5)
+def cambiar_estado_turnos():
+    data = request.get_json()
+    if not data or not data.get('estado'):
+        return jsonify({'success': False, 'mensaje': 'Falta el estado'}), 400
+    
+    estado = data['estado']
+    if estado not in ESTADOS_FINALES:
+        return jsonify({'success': False, 'mensaje': f'Estado inválido ({", ".join(ESTADOS_FINALES)})'}), 400
+    
+    ids = data.get('ids')
+    fecha = None
+    
+    if ids is not None:
+        if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+            return jsonify({'success': False, 'mensaje': 'ids debe ser una lista de números'}), 400
+    elif data.get('fecha'):
+        try:
+            fecha = datetime.strptime(data['fecha'], '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({'success': False, 'mensaje': 'Formato de fecha inválido (YYYY-MM-DD)'}), 400
+    else:
+        return jsonify({'success': False, 'mensaje': 'Falta ids o fecha'}), 400
+    
+    resultado = GestionTurnosService.cambiar_estado_masivo(
+        estado,
+        ids=ids,
+        fecha=fecha,
+        filtro_estado=data.get('filtro_estado')
+    )
+    status_code = 200 if resultado['success'] else 400
+    return jsonify(resultado), status_code
+
 # Eliminar turno
 @management_bp.route('/turnos/<int:turno_id>', methods=['DELETE'])
 @jwt_required()
+@presupuesto_consultas(3)
 def eliminar_turno(turno_id):
     resultado = GestionTurnosService.eliminar_turno(turno_id)
     status_code = 200 if resultado['success'] else 400
-    return jsonify(resultado), status_code
\ No newline at end of file
+    return jsonify(resultado), status_code
+
+# Estadísticas de la cache de turno activo (aciertos / fallos de este proceso)
+@management_bp.route('/cache', methods=['GET'])
+@jwt_required()
+def estadisticas_cache():
+    from app.appointments.service import cache_turno_activo
+    
+    return jsonify({
+        'success': True,
+        'turno_activo': cache_turno_activo.estadisticas()
+    }), 200
+
+# Estado del pool de conexiones a la BD (en uso, overflow, esperas) de este proceso
+@management_bp.route('/pool', methods=['GET'])
+@jwt_required()
+def estadisticas_pool():
+    from app.database import db
+    from app.pool import metricas_pool
+    
+    return jsonify({
+        'success': True,
+        'pool': metricas_pool.estadisticas(db.engine.pool)
+    }), 200
@@ -1,26 +1,116 @@
-from app.management.models import GestionTurnos
+from app.management.models import GestionTurnos, GestionTurnosHistorico
+from app.services.models import Servicio
+from app.appointments.service import TurnoService
 from app.database import db
+from sqlalchemy import and_, or_, select, union_all, update
+from sqlalchemy.orm import contains_eager
 from datetime import datetime, date
+import base64
+
+# Columnas del export de turnos (en este orden)
+COLUMNAS_EXPORT = [
+    'id', 'fecha', 'hora', 'servicio_id', 'nombre_servicio', 'categoria_servicio',
+    'precio_servicio', 'nombre_cliente', 'telefono_cliente', 'estado', 'creado_en',
+]
+
+# Cantidad de filas que se traen de la BD por tanda al exportar
+TAMANO_TANDA_EXPORT = 1000
+
+# Estados a los que se puede pasar un turno desde gestión (en masa)
+ESTADOS_FINALES = ('completado', 'cancelado', 'no-show')
+
+# Paginación del listado de turnos (cantidad de turnos por página)
+LIMITE_POR_DEFECTO = 50
+LIMITE_MAXIMO = 200
 
 class GestionTurnosService:
+
+    @staticmethod
+    def obtener_todos_turnos(fecha_filtro=None, estado=None, desde=None, hasta=None,
+                             servicio_id=None, cursor=None, limite=LIMITE_POR_DEFECTO, historico=False):
+        """Obtener una página de turnos con JOIN a servicios
+        
+        Paginación por cursor (keyset) sobre (fecha desc, hora asc, id asc):
+        en vez de OFFSET, cada página arranca después del último turno de la anterior.
+        Con historico=True también trae los turnos archivados (una consulta más
+        sobre turnos_historico, con los mismos filtros, y se mezclan en orden).
+        Las fechas (fecha_filtro, desde, hasta) llegan ya validadas como date.
+        Retorna (turnos, siguiente_cursor); siguiente_cursor es None en la última página.
+        Los errores de la BD no se tapan: una página vacía con next_cursor None
+        haría creer al cliente que ya trajo todo.
+        """
+        filtros = (fecha_filtro, estado, desde, hasta, servicio_id, cursor)
+        
+        # Pedimos uno más que el límite para saber si hay otra página
+        turnos = GestionTurnosService._pagina_turnos(GestionTurnos, *filtros, limite + 1)
+        
+        if historico:
+            turnos += GestionTurnosService._pagina_turnos(GestionTurnosHistorico, *filtros, limite + 1)
+            turnos.sort(key=lambda t: (-t.fecha.toordinal(), t.hora, t.id))
+            turnos = turnos[:limite + 1]
+        
+        if len(turnos) <= limite:
+            return turnos, None
+        
+        turnos = turnos[:limite]
+        return turnos, GestionTurnosService.codificar_cursor(turnos[-1])
+    
+    @staticmethod
+    def _pagina_turnos(modelo, fecha_filtro, estado, desde, hasta, servicio_id, cursor, cantidad):
+        """Traer hasta "cantidad" turnos de la tabla de "modelo" (turnos o turnos_historico)"""
+        # contains_eager carga el servicio desde el mismo JOIN
+        # (si no, to_dict() haría un SELECT por cada servicio)
+        query = modelo.query.join(modelo.servicio)\
+            .options(contains_eager(modelo.servicio))
+        
+        # Filtrar por fecha si se especifica
+        if fecha_filtro:
+            query = query.filter(modelo.fecha == fecha_filtro)
+        
+        # Filtros opcionales (se aplican en SQL)
+        if estado:
+            query = query.filter(modelo.estado == estado)
+        if desde:
+            query = query.filter(modelo.fecha >= desde)
+        if hasta:
+            query = query.filter(modelo.fecha <= hasta)
+        if servicio_id:
+            query = query.filter(modelo.servicio_id == servicio_id)
+        
+        # Arrancamos después del último turno de la página anterior
+        if cursor:
+            fecha, hora, turno_id = cursor
+            query = query.filter(or_(
+                modelo.fecha < fecha,
+                and_(modelo.fecha == fecha, or_(
+                    modelo.hora > hora,
+                    and_(modelo.hora == hora, modelo.id > turno_id)
+                ))
+            ))
+        
+        # Ordenar por fecha (más reciente primero) y hora
+        return query.order_by(
+            modelo.fecha.desc(), modelo.hora.asc(), modelo.id.asc()
+        ).limit(cantidad).all()
+    
+    @staticmethod
+    def codificar_cursor(turno):
+        """Armar el cursor (opaco) que apunta al turno dado"""
+        valor = f'{turno.fecha.isoformat()}|{turno.hora.isoformat()}|{turno.id}'
+        return base64.urlsafe_b64encode(valor.encode()).decode()
     
     @staticmethod
-    def obtener_todos_turnos(fecha_filtro=None):
-        """Obtener todos los turnos con JOIN a servicios"""
+    def decodificar_cursor(cursor):
+        """Leer un cursor: retorna (fecha, hora, id) o lanza ValueError si es inválido"""
         try:
-            query = GestionTurnos.query.join(GestionTurnos.servicio)
-            
-            # Filtrar por fecha si se especifica
-            if fecha_filtro:
-                fecha = datetime.strptime(fecha_filtro, '%Y-%m-%d').date()
-                query = query.filter(GestionTurnos.fecha == fecha)
-            
-            # Ordenar por fecha (más reciente primero) y hora
-            turnos = query.order_by(GestionTurnos.fecha.desc(), GestionTurnos.hora.asc()).all()
-            return turnos
-        except Exception as e:
-            print(f"Error al obtener turnos: {str(e)}")
-            return []
+            fecha, hora, turno_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+            return (
+                date.fromisoformat(fecha),
+                datetime.strptime(hora, '%H:%M:%S').time(),
+                int(turno_id)
+            )
+        except Exception:
+            raise ValueError('Cursor inválido')
     
     @staticmethod
     def obtener_turno_por_id(turno_id):
@@ -40,14 +130,98 @@ class GestionTurnosService:
             if not turno:
                 return {'success': False, 'mensaje': 'Turno no encontrado'}
             
+            # Si estaba cancelado vuelve a ocupar su lugar en el contador del día
+            GestionTurnosService._actualizar_contadores([turno], 'completado')
             turno.estado = 'completado'
             db.session.commit()
             
+            TurnoService.invalidar_turno_activo(turno.client_id)
+            
             return {'success': True, 'mensaje': 'Turno marcado como completado'}
         except Exception as e:
             db.session.rollback()
             return {'success': False, 'mensaje': f'Error al completar turno: {str(e)}'}
     
+    @staticmethod
+    def cambiar_estado_masivo(estado, ids=None, fecha=None, filtro_estado=None):
+        """Cambiar el estado de muchos turnos en una sola transacción
+        
+        Los turnos se eligen por lista de ids o por fecha (y opcionalmente su
+        estado actual). El cambio es un solo UPDATE ... WHERE id IN (...).
+        Retorna el resultado de cada id: actualizado, sin_cambios o no_encontrado.
+        """
+        try:
+            # Leemos (y bloqueamos) los turnos elegidos en una sola consulta
+            query = db.session.query(
+                GestionTurnos.id, GestionTurnos.fecha, GestionTurnos.estado, GestionTurnos.client_id
+            )
+            if ids is not None:
+                query = query.filter(GestionTurnos.id.in_(ids))
+            else:
+                query = query.filter(GestionTurnos.fecha == fecha)
+                if filtro_estado:
+                    query = query.filter(GestionTurnos.estado == filtro_estado)
+            
+            encontrados = {fila.id: fila for fila in query.with_for_update().all()}
+            
+            a_cambiar = [fila for fila in encontrados.values() if fila.estado != estado]
+            
+            if a_cambiar:
+                # UPDATE turnos SET estado = ? WHERE id IN (...)
+                db.session.execute(
+                    update(GestionTurnos)
+                    .where(GestionTurnos.id.in_([fila.id for fila in a_cambiar]))
+                    .values(estado=estado, actualizado_en=datetime.utcnow()),
+                    execution_options={'synchronize_session': False}
+                )
+                
+                # Los turnos cancelados liberan su lugar en el contador del día
+                GestionTurnosService._actualizar_contadores(a_cambiar, estado)
+            
+            db.session.commit()
+            
+            TurnoService.invalidar_turno_activo(*{fila.client_id for fila in a_cambiar})
+            
+            # Resultado por id (en el orden pedido)
+            ids_cambiados = {fila.id for fila in a_cambiar}
+            ids_resultado = ids if ids is not None else sorted(encontrados)
+            resultados = []
+            for turno_id in ids_resultado:
+                if turno_id in ids_cambiados:
+                    resultado = 'actualizado'
+                elif turno_id in encontrados:
+                    resultado = 'sin_cambios'
+                else:
+                    resultado = 'no_encontrado'
+                resultados.append({'id': turno_id, 'resultado': resultado})
+            
+            return {
+                'success': True,
+                'mensaje': f'{len(ids_cambiados)} turnos marcados como {estado}',
+                'actualizados': len(ids_cambiados),
+                'resultados': resultados
+            }
+        except Exception as e:
+            db.session.rollback()
+            return {'success': False, 'mensaje': f'Error al actualizar turnos: {str(e)}'}
+    
+    @staticmethod
+    def _actualizar_contadores(turnos, estado_nuevo):
+        """Ajustar turnos_por_dia según los turnos que entran o salen de 'cancelado'
+        
+        Un solo UPDATE para todos los días (ver TurnoService.ajustar_contadores).
+        Los turnos cancelados que vuelven a ocupar lugar no tienen tope: lo decide el admin.
+        """
+        cambios = {}
+        
+        for turno in turnos:
+            if estado_nuevo == 'cancelado' and turno.estado != 'cancelado':
+                cambios[turno.fecha] = cambios.get(turno.fecha, 0) - 1
+            elif turno.estado == 'cancelado' and estado_nuevo != 'cancelado':
+                cambios[turno.fecha] = cambios.get(turno.fecha, 0) + 1
+        
+        TurnoService.ajustar_contadores(cambios)
+    
     @staticmethod
     def eliminar_turno(turno_id):
         """Eliminar un turno"""
@@ -56,9 +230,16 @@ class GestionTurnosService:
             if not turno:
                 return {'success': False, 'mensaje': 'Turno no encontrado'}
             
+            # Si el turno ocupaba un lugar en el día, lo liberamos del contador
+            if turno.estado != 'cancelado':
+                TurnoService.restar_turno_del_dia(turno.fecha)
+            
+            client_id = turno.client_id
             db.session.delete(turno)
             db.session.commit()
             
+            TurnoService.invalidar_turno_activo(client_id)
+            
             return {'success': True, 'mensaje': 'Turno eliminado correctamente'}
         except Exception as e:
             db.session.rollback()
@@ -71,8 +252,51 @@ class GestionTurnosService:
             hoy = date.today()
             turnos = GestionTurnos.query.filter(GestionTurnos.fecha == hoy)\
                 .join(GestionTurnos.servicio)\
+                .options(contains_eager(GestionTurnos.servicio))\
                 .order_by(GestionTurnos.hora.asc()).all()
             return turnos
         except Exception as e:
             print(f"Error al obtener turnos de hoy: {str(e)}")
-            return []
\ No newline at end of file
+            return []
+    
+    @staticmethod
+    def exportar_turnos(desde, hasta, historico=False):
+        """Recorrer los turnos de un rango de fechas en tandas (para exportar)
+        
+        Usa yield_per para que la BD devuelva las filas de a tandas (cursor del
+        lado del servidor cuando el motor lo soporta) en vez de cargarlas todas.
+        Con historico=True suma los turnos archivados (UNION ALL, en la misma consulta).
+        Genera listas de dicts con las COLUMNAS_EXPORT.
+        """
+        consulta = GestionTurnosService._consulta_export(GestionTurnos, desde, hasta)
+        
+        if historico:
+            consulta = union_all(
+                consulta, GestionTurnosService._consulta_export(GestionTurnosHistorico, desde, hasta)
+            ).subquery()
+            consulta = select(consulta).order_by(consulta.c.fecha, consulta.c.hora, consulta.c.id)
+        else:
+            consulta = consulta.order_by(GestionTurnos.fecha, GestionTurnos.hora, GestionTurnos.id)
+        
+        resultado = db.session.execute(consulta.execution_options(yield_per=TAMANO_TANDA_EXPORT))
+        
+        for tanda in resultado.mappings().partitions():
+            yield [dict(fila) for fila in tanda]
+    
+    @staticmethod
+    def _consulta_export(modelo, desde, hasta):
+        """SELECT de las COLUMNAS_EXPORT sobre la tabla de "modelo" (sin ORDER BY)"""
+        return select(
+            modelo.id.label('id'),
+            modelo.fecha,
+            modelo.hora,
+            modelo.servicio_id,
+            Servicio.nombre_servicio,
+            Servicio.categoria.label('categoria_servicio'),
+            Servicio.precio.label('precio_servicio'),
+            modelo.nombre_cliente,
+            modelo.telefono_cliente,
+            modelo.estado,
+            modelo.creado_en,
+        ).outerjoin(Servicio, modelo.servicio_id == Servicio.id)\
+            .where(modelo.fecha >= desde, modelo.fecha <= hasta)
@@ -0,0 +1,171 @@
+import bisect
+import hmac
+import threading
+import time
+from flask import g, has_request_context, request, Response, current_app
+from flask_jwt_extended import verify_jwt_in_request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Límites (en segundos) de los buckets del histograma de latencia
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+# Métricas por endpoint (por proceso: cada worker de gunicorn tiene las suyas)
+# Clave: (endpoint, método HTTP)
+class MetricasHTTP:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+    
+    # Poner todo en cero
+    def reiniciar(self):
+        with self._lock:
+            self._latencia = {}  # clave -> [conteo por bucket..., +Inf]
+            self._latencia_total = {}  # clave -> segundos
+            self._estados = {}  # (endpoint, método, status) -> requests
+            self._sql_consultas = {}  # clave -> consultas
+            self._sql_tiempo = {}  # clave -> segundos
+    
+    # Registrar un request terminado
+    def registrar(self, endpoint, metodo, status, segundos, consultas, tiempo_sql):
+        clave = (endpoint, metodo)
+        bucket = bisect.bisect_left(BUCKETS_LATENCIA, segundos)
+        
+        with self._lock:
+            buckets = self._latencia.get(clave)
+            if buckets is None:
+                buckets = self._latencia[clave] = [0] * (len(BUCKETS_LATENCIA) + 1)
+            buckets[bucket] += 1
+            
+            self._latencia_total[clave] = self._latencia_total.get(clave, 0.0) + segundos
+            self._estados[clave + (status,)] = self._estados.get(clave + (status,), 0) + 1
+            self._sql_consultas[clave] = self._sql_consultas.get(clave, 0) + consultas
+            self._sql_tiempo[clave] = self._sql_tiempo.get(clave, 0.0) + tiempo_sql
+    
+    # Exportar en el formato de texto de Prometheus
+    def formato_prometheus(self):
+        with self._lock:
+            latencia = {clave: list(buckets) for clave, buckets in self._latencia.items()}
+            latencia_total = dict(self._latencia_total)
+            estados = dict(self._estados)
+            sql_consultas = dict(self._sql_consultas)
+            sql_tiempo = dict(self._sql_tiempo)
+        
+        lineas = [
+            '# HELP http_request_duration_seconds Latencia de los requests por endpoint.',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        for (endpoint, metodo), buckets in sorted(latencia.items()):
+            etiquetas = _etiquetas(endpoint=endpoint, method=metodo)
+            acumulado = 0
+            for limite, cantidad in zip(BUCKETS_LATENCIA + ('+Inf',), buckets):
+                acumulado += cantidad
+                lineas.append(f'http_request_duration_seconds_bucket{{{etiquetas},le="{limite}"}} {acumulado}')
+            lineas.append(f'http_request_duration_seconds_sum{{{etiquetas}}} {latencia_total[(endpoint, metodo)]:.6f}')
+            lineas.append(f'http_request_duration_seconds_count{{{etiquetas}}} {acumulado}')
+        
+        lineas += [
+            '# HELP http_requests_total Requests por endpoint y código de respuesta.',
+            '# TYPE http_requests_total counter',
+        ]
+        for (endpoint, metodo, status), cantidad in sorted(estados.items()):
+            lineas.append(f'http_requests_total{{{_etiquetas(endpoint=endpoint, method=metodo, status=status)}}} {cantidad}')
+        
+        lineas += [
+            '# HELP http_request_sql_queries_total Consultas SQL ejecutadas por endpoint.',
+            '# TYPE http_request_sql_queries_total counter',
+        ]
+        for (endpoint, metodo), cantidad in sorted(sql_consultas.items()):
+            lineas.append(f'http_request_sql_queries_total{{{_etiquetas(endpoint=endpoint, method=metodo)}}} {cantidad}')
+        
+        lineas += [
+            '# HELP http_request_sql_duration_seconds_total Tiempo en consultas SQL por endpoint.',
+            '# TYPE http_request_sql_duration_seconds_total counter',
+        ]
+        for (endpoint, metodo), segundos in sorted(sql_tiempo.items()):
+            lineas.append(f'http_request_sql_duration_seconds_total{{{_etiquetas(endpoint=endpoint, method=metodo)}}} {segundos:.6f}')
+        
+        return '\n'.join(lineas) + '\n'
+
+
+# Armar las etiquetas de Prometheus (escapando barras, comillas y saltos de línea)
+def _etiquetas(**valores):
+    return ','.join(
+        f'{nombre}="{_escapar(valor)}"' for nombre, valor in valores.items()
+    )
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+metricas_http = MetricasHTTP()
+
+
+# Contar las consultas SQL del request actual (eventos a nivel de clase Engine,
+# así no hace falta crear el engine al arrancar)
+@event.listens_for(Engine, 'before_cursor_execute')
+def _antes_de_consulta(conn, cursor, statement, parameters, context, executemany):
+    conn.info['metricas_inicio'] = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _despues_de_consulta(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'metricas_sql' in g:
+        g.metricas_sql[0] += 1
+        g.metricas_sql[1] += time.perf_counter() - conn.info['metricas_inicio']
+
+
+# Registrar los hooks de Flask y la ruta /metrics
+# Se configura con METRICAS_ACTIVAS y METRICAS_TOKEN
+def registrar_metricas(app):
+    if not app.config['METRICAS_ACTIVAS']:
+        return
+    
+    @app.before_request
+    def _inicio_request():
+        g.metricas_inicio = time.perf_counter()
+        g.metricas_sql = [0, 0.0]  # consultas, segundos
+    
+    @app.after_request
+    def _fin_request(response):
+        _registrar_request(response.status_code)
+        return response
+    
+    # Si hubo una excepción sin manejar no pasa por after_request: se cuenta como 500
+    @app.teardown_request
+    def _fin_con_error(error):
+        if error is not None:
+            _registrar_request(500)
+    
+    @app.route('/metrics', methods=['GET'])
+    def metricas():
+        _verificar_acceso()
+        return Response(metricas_http.formato_prometheus(), mimetype='text/plain; version=0.0.4')
+
+
+# Guardar las métricas del request (una sola vez por request)
+def _registrar_request(status):
+    inicio = g.pop('metricas_inicio', None)
+    if inicio is None:
+        return
+    
+    consultas, tiempo_sql = g.metricas_sql
+    metricas_http.registrar(
+        request.endpoint or 'sin_ruta',
+        request.method,
+        status,
+        time.perf_counter() - inicio,
+        consultas,
+        tiempo_sql
+    )
+
+
+# /metrics: con METRICAS_TOKEN (para Prometheus) o con el JWT de un admin
+def _verificar_acceso():
+    token = current_app.config['METRICAS_TOKEN']
+    if token and hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return
+    verify_jwt_in_request()
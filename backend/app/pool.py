@@ -0,0 +1,127 @@
+import logging
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+
+# Contadores del pool de conexiones (por proceso)
+class MetricasPool:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.log_espera = 0.1  # segundos; se pisa con DB_POOL_LOG_ESPERA_MS
+        self.reiniciar()
+    
+    # Poner todos los contadores en cero
+    def reiniciar(self):
+        with self._lock:
+            self.conexiones_creadas = 0
+            self.conexiones_invalidadas = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.timeouts = 0
+            self.espera_total = 0.0
+            self.espera_max = 0.0
+    
+    # Sumar un evento simple (conexión creada, checkout, etc.)
+    def sumar(self, contador):
+        with self._lock:
+            setattr(self, contador, getattr(self, contador) + 1)
+    
+    # Registrar cuánto tardó conseguir una conexión del pool
+    def registrar_espera(self, segundos, timeout=False):
+        with self._lock:
+            self.espera_total += segundos
+            self.espera_max = max(self.espera_max, segundos)
+            if timeout:
+                self.timeouts += 1
+        
+        if timeout:
+            logger.warning('Pool de conexiones agotado: timeout después de %.0f ms', segundos * 1000)
+        elif segundos >= self.log_espera:
+            logger.warning('Conseguir una conexión del pool tardó %.0f ms', segundos * 1000)
+    
+    # Estado actual del pool + contadores acumulados
+    def estadisticas(self, pool):
+        with self._lock:
+            datos = {
+                'conexiones_creadas': self.conexiones_creadas,
+                'conexiones_invalidadas': self.conexiones_invalidadas,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'timeouts': self.timeouts,
+                'espera_total_ms': round(self.espera_total * 1000, 2),
+                'espera_promedio_ms': round(self.espera_total * 1000 / self.checkouts, 2) if self.checkouts else 0.0,
+                'espera_max_ms': round(self.espera_max * 1000, 2),
+            }
+        
+        datos['tipo'] = type(pool).__name__
+        
+        # Solo el QueuePool tiene tamaño y overflow
+        if isinstance(pool, QueuePool):
+            datos.update({
+                'tamano': pool.size(),
+                'en_uso': pool.checkedout(),
+                'disponibles': pool.checkedin(),
+                'overflow': pool.overflow(),
+                'timeout': pool.timeout(),
+            })
+        
+        return datos
+
+
+metricas_pool = MetricasPool()
+
+
+# QueuePool que mide cuánto se tarda en conseguir una conexión
+# (incluye la espera cuando el pool está lleno, el pre_ping y la conexión nueva si hace falta)
+class QueuePoolMedido(QueuePool):
+
+    def connect(self):
+        inicio = time.perf_counter()
+        try:
+            conexion = super().connect()
+        except PoolTimeoutError:
+            metricas_pool.registrar_espera(time.perf_counter() - inicio, timeout=True)
+            raise
+        
+        metricas_pool.registrar_espera(time.perf_counter() - inicio)
+        return conexion
+
+
+# Antes de crear el engine: usar el pool medido cuando corresponde
+# (SQLite y los pools que se configuren a mano quedan como están)
+def configurar_pool(app):
+    opciones = app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+    url = app.config.get('SQLALCHEMY_DATABASE_URI') or ''
+    
+    if 'poolclass' not in opciones and not url.startswith('sqlite'):
+        opciones['poolclass'] = QueuePoolMedido
+    
+    metricas_pool.log_espera = app.config.get('DB_POOL_LOG_ESPERA_MS', 100) / 1000
+
+
+# Contar conexiones y checkouts con los eventos del pool
+# Se escuchan a nivel de clase (Pool) para no tener que crear el engine al arrancar
+@event.listens_for(Pool, 'connect')
+def _conexion_creada(dbapi_connection, connection_record):
+    metricas_pool.sumar('conexiones_creadas')
+
+
+@event.listens_for(Pool, 'checkout')
+def _checkout(dbapi_connection, connection_record, connection_proxy):
+    metricas_pool.sumar('checkouts')
+
+
+@event.listens_for(Pool, 'checkin')
+def _checkin(dbapi_connection, connection_record):
+    metricas_pool.sumar('checkins')
+
+
+@event.listens_for(Pool, 'invalidate')
+def _invalidada(dbapi_connection, connection_record, exception):
+    metricas_pool.sumar('conexiones_invalidadas')
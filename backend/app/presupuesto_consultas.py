@@ -0,0 +1,148 @@
+import logging
+import os
+import sys
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import current_app, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Carpeta del paquete app (para encontrar el código propio en el stack)
+_CARPETA_APP = os.path.dirname(os.path.abspath(__file__))
+
+# Registro de consultas activo en este request / bloque (None = no se está midiendo)
+_registro_actual = ContextVar('registro_consultas', default=None)
+
+
+# Error cuando un endpoint se pasa de su presupuesto (modo "fallar")
+class PresupuestoConsultasExcedido(Exception):
+    pass
+
+
+# Consultas SQL ejecutadas mientras el registro está activo
+class RegistroConsultas:
+
+    def __init__(self):
+        self.consultas = []  # (sql, lugar donde se originó)
+    
+    @property
+    def total(self):
+        return len(self.consultas)
+    
+    # Consultas con el mismo SQL (misma forma, distintos parámetros) repetidas al menos "minimo" veces
+    # Retorna [(sql, cantidad, [lugares])], de la más repetida a la menos
+    def repetidas(self, minimo=2):
+        conteo = Counter(sql for sql, _ in self.consultas)
+        resultado = []
+        
+        for sql, cantidad in conteo.most_common():
+            if cantidad < minimo:
+                break
+            lugares = sorted({lugar for otro, lugar in self.consultas if otro == sql})
+            resultado.append((sql, cantidad, lugares))
+        
+        return resultado
+    
+    # Texto con los problemas encontrados (para el log o la excepción)
+    def reporte(self, titulo, minimo_repetidas):
+        lineas = [titulo]
+        for sql, cantidad, lugares in self.repetidas(minimo_repetidas):
+            lineas.append(f'  {cantidad}x {" ".join(sql.split())[:200]}')
+            lineas.extend(f'      desde {lugar}' for lugar in lugares)
+        return '\n'.join(lineas)
+
+
+# Contar las consultas de un bloque de código (scripts, benchmarks, tests)
+# with contar_consultas() as registro:
+#     ...
+# registro.total / registro.repetidas()
+@contextmanager
+def contar_consultas():
+    registro = RegistroConsultas()
+    token = _registro_actual.set(registro)
+    try:
+        yield registro
+    finally:
+        _registro_actual.reset(token)
+
+
+# Buscar en el stack la primera línea de código propio (fuera de este módulo)
+def _lugar_de_origen():
+    frame = sys._getframe(2)
+    while frame is not None:
+        archivo = frame.f_code.co_filename
+        if archivo.startswith(_CARPETA_APP) and archivo != __file__:
+            relativo = os.path.relpath(archivo, os.path.dirname(_CARPETA_APP))
+            return f'{relativo}:{frame.f_lineno} ({frame.f_code.co_name})'
+        frame = frame.f_back
+    return 'desconocido'
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _registrar_consulta(conn, cursor, statement, parameters, context, executemany):
+    registro = _registro_actual.get()
+    if registro is not None:
+        registro.consultas.append((statement, _lugar_de_origen()))
+
+
+# Decorador para declarar cuántas consultas puede hacer una vista
+# @presupuesto_consultas(3)
+# Solo se controla con PRESUPUESTO_CONSULTAS_ACTIVO (desarrollo / tests)
+def presupuesto_consultas(maximo):
+    def decorador(vista):
+        vista.presupuesto_consultas = maximo
+        return vista
+    
+    return decorador
+
+
+# Registrar el control en la app (solo si PRESUPUESTO_CONSULTAS_ACTIVO)
+# PRESUPUESTO_CONSULTAS_MODO: "advertir" (log) o "fallar" (excepción -> 500 / test que falla)
+# CONSULTAS_REPETIDAS_MAX: a partir de cuántas consultas iguales se avisa de un posible N+1
+def registrar_presupuesto_consultas(app):
+    if not app.config['PRESUPUESTO_CONSULTAS_ACTIVO']:
+        return
+    
+    @app.before_request
+    def _empezar_registro():
+        g.presupuesto_consultas_token = _registro_actual.set(RegistroConsultas())
+    
+    @app.after_request
+    def _revisar_registro(response):
+        registro = _registro_actual.get()
+        if registro is None:
+            return response
+        
+        response.headers['X-Consultas-SQL'] = str(registro.total)
+        _revisar(registro)
+        return response
+    
+    @app.teardown_request
+    def _terminar_registro(error):
+        token = g.pop('presupuesto_consultas_token', None)
+        if token is not None:
+            _registro_actual.reset(token)
+
+
+# Comparar lo ejecutado contra el presupuesto de la vista y buscar consultas repetidas
+def _revisar(registro):
+    minimo_repetidas = current_app.config['CONSULTAS_REPETIDAS_MAX']
+    vista = current_app.view_functions.get(request.endpoint)
+    maximo = getattr(vista, 'presupuesto_consultas', None)
+    
+    problemas = []
+    if maximo is not None and registro.total > maximo:
+        problemas.append(f'{request.endpoint}: {registro.total} consultas (presupuesto {maximo})')
+    if registro.repetidas(minimo_repetidas):
+        problemas.append(f'{request.endpoint}: consultas repetidas (posible N+1)')
+    
+    if not problemas:
+        return
+    
+    mensaje = registro.reporte('; '.join(problemas), minimo_repetidas)
+    if current_app.config['PRESUPUESTO_CONSULTAS_MODO'] == 'fallar':
+        raise PresupuestoConsultasExcedido(mensaje)
+    logger.warning(mensaje)
@@ -0,0 +1,256 @@
+import random
+import secrets
+import click
+from datetime import date, datetime, time, timedelta
+from flask.cli import with_appcontext
+from sqlalchemy import delete, insert, select
+from app.appointments.models import Turno, TurnoHistorico, TurnosPorDia
+from app.appointments.service import TurnoService, cache_turno_activo
+from app.business.service import NegocioService
+from app.database import db
+from app.services.models import Servicio
+
+# Datos de ejemplo para generar servicios y clientes
+SERVICIOS_EJEMPLO = [
+    ('Corte de pelo', 'Peluquería', 6000),
+    ('Corte y barba', 'Peluquería', 8500),
+    ('Barba', 'Barbería', 4000),
+    ('Color', 'Coloración', 15000),
+    ('Mechas', 'Coloración', 22000),
+    ('Alisado', 'Tratamientos', 30000),
+    ('Lavado y peinado', 'Peluquería', 5000),
+    ('Manicura', 'Uñas', 7000),
+    ('Pedicura', 'Uñas', 9000),
+    ('Depilación de cejas', 'Estética', 3500),
+]
+NOMBRES = ['Ana', 'Juan', 'María', 'Lucas', 'Sofía', 'Martín', 'Valentina', 'Diego', 'Camila', 'Pablo', 'Julieta', 'Tomás']
+APELLIDOS = ['García', 'Fernández', 'López', 'Martínez', 'González', 'Pérez', 'Romero', 'Sosa', 'Díaz', 'Álvarez']
+
+# Estados de los turnos pasados y su proporción aproximada
+ESTADOS_PASADOS = ('completado', 'cancelado', 'no-show')
+PESOS_ESTADOS_PASADOS = (75, 15, 10)
+
+# Configuración que se crea si el negocio todavía no está configurado (lunes a sábado)
+CONFIGURACION_EJEMPLO = {
+    'nombre': 'Negocio de prueba',
+    'telefono': '1155550000',
+    'email': 'negocio@example.com',
+    'direccion': 'Av. Siempreviva 742',
+    'duracion_turno': 30,
+    'intervalo_turnos': 30,
+    'max_turnos': 16,
+    'horarios': [
+        {
+            'dia_semana': dia,
+            'hora_apertura': '09:00',
+            'hora_cierre': '19:00',
+            'hora_descanso_inicio': '13:00',
+            'hora_descanso_fin': '14:00',
+            'abierto': dia < 6,
+        }
+        for dia in range(7)
+    ],
+}
+
+
+# Convertir "10k", "100k", "1M" o "25000" a número
+def parsear_cantidad(valor):
+    texto = str(valor).strip().lower()
+    multiplicador = {'k': 1_000, 'm': 1_000_000}.get(texto[-1:], 1)
+    if multiplicador != 1:
+        texto = texto[:-1]
+    return int(float(texto) * multiplicador)
+
+
+# Borrar turnos (también los archivados), contadores y servicios (para volver a generar desde cero)
+def limpiar_datos():
+    db.session.execute(delete(TurnosPorDia))
+    db.session.execute(delete(Turno))
+    db.session.execute(delete(TurnoHistorico))
+    db.session.execute(delete(Servicio))
+    db.session.commit()
+    cache_turno_activo.limpiar()
+
+
+# Crear la configuración del negocio si no existe
+def _asegurar_negocio():
+    if NegocioService.obtener_negocio() is None:
+        resultado = NegocioService.guardar_configuracion_completa(CONFIGURACION_EJEMPLO)
+        if not resultado['success']:
+            raise click.ClickException(resultado['mensaje'])
+    
+    return NegocioService.construir_plantillas()
+
+
+# Crear servicios hasta llegar a "cantidad" (activos) y devolver sus ids
+def _asegurar_servicios(cantidad):
+    ids = list(db.session.scalars(select(Servicio.id).where(Servicio.activo.is_(True))))
+    
+    nuevos = []
+    for i in range(len(ids), cantidad):
+        nombre, categoria, precio = SERVICIOS_EJEMPLO[i % len(SERVICIOS_EJEMPLO)]
+        if i >= len(SERVICIOS_EJEMPLO):
+            nombre = f'{nombre} {i // len(SERVICIOS_EJEMPLO) + 1}'
+        nuevos.append(Servicio(nombre_servicio=nombre, categoria=categoria, precio=precio))
+    
+    if nuevos:
+        db.session.add_all(nuevos)
+        db.session.commit()
+        ids += [servicio.id for servicio in nuevos]
+    
+    return ids
+
+
+# Días abiertos de un rango con sus slots [(fecha, [time, ...]), ...]
+def _dias_con_slots(desde, hasta, slots_semana):
+    dias = []
+    fecha = desde
+    while fecha <= hasta:
+        slots = slots_semana.get(fecha.weekday()) or ()
+        if slots:
+            dias.append((fecha, [time.fromisoformat(slot) for slot in slots]))
+        fecha += timedelta(days=1)
+    return dias
+
+
+# Fila de la tabla turnos lista para el INSERT
+def _fila_turno(fecha, hora, servicio_id, client_id, estado, aleatorio):
+    creado = datetime.combine(fecha, hora) - timedelta(days=aleatorio.randint(1, 20), minutes=aleatorio.randint(0, 600))
+    return {
+        'fecha': fecha,
+        'hora': hora,
+        'servicio_id': servicio_id,
+        'nombre_cliente': f'{aleatorio.choice(NOMBRES)} {aleatorio.choice(APELLIDOS)}',
+        'telefono_cliente': f'11{aleatorio.randint(10_000_000, 99_999_999)}',
+        'client_id': client_id,
+        'estado': estado,
+        # Hash de un token que nadie conoce (64 caracteres hex, único)
+        'token_hash': secrets.token_hex(32),
+        'creado_en': creado,
+        'actualizado_en': creado if estado == 'reservado' else datetime.combine(fecha, hora),
+    }
+
+
+# Generar las filas de turnos (de a una, para no tenerlas todas en memoria)
+# - Los pasados se reparten entre dias_historia días, en cualquier estado final
+#   (pueden repetir fecha y hora: el índice único es solo para los reservados)
+# - Los futuros quedan reservados: uno por horario y por cliente, sin pasar max_turnos
+def _generar_turnos(cantidad, dias_historia, dias_futuro, ocupacion, plantillas, servicios, aleatorio):
+    hoy = date.today()
+    max_turnos = plantillas['max_turnos'] or 10 ** 9
+    
+    # Turnos futuros (reservados), sin pisar los que ya estén reservados
+    desde, hasta = hoy + timedelta(days=1), hoy + timedelta(days=dias_futuro)
+    reservadas = TurnoService.obtener_horas_reservadas_rango(desde, hasta)
+    contadores = TurnoService.obtener_reservados_rango(desde, hasta)
+    
+    futuros = []
+    for fecha, slots in _dias_con_slots(desde, hasta, plantillas['slots']):
+        libres = [hora for hora in slots if hora.strftime('%H:%M') not in reservadas.get(fecha, ())]
+        ocupados = min(int(len(slots) * ocupacion), max_turnos - contadores.get(fecha, 0), len(libres))
+        if ocupados > 0:
+            futuros += [(fecha, hora) for hora in sorted(aleatorio.sample(libres, ocupados))]
+    futuros = futuros[:cantidad]
+    
+    # Turnos pasados (el resto)
+    pasados = cantidad - len(futuros)
+    dias_pasados = _dias_con_slots(hoy - timedelta(days=dias_historia), hoy - timedelta(days=1), plantillas['slots'])
+    if pasados and not dias_pasados:
+        raise click.ClickException('El negocio no tiene días abiertos en el rango de historia')
+    
+    # Clientes habituales: cada uno tiene varios turnos en la historia
+    clientes = max(1, pasados // 8)
+    
+    for i in range(pasados):
+        # Se recorren los días en orden (como se cargarían en la realidad)
+        fecha, slots = dias_pasados[i * len(dias_pasados) // pasados]
+        estado = aleatorio.choices(ESTADOS_PASADOS, PESOS_ESTADOS_PASADOS)[0]
+        yield _fila_turno(
+            fecha,
+            aleatorio.choice(slots),
+            aleatorio.choice(servicios),
+            f'cliente-{aleatorio.randrange(clientes):08d}',
+            estado,
+            aleatorio
+        )
+    
+    # Un client_id distinto por reserva (con un prefijo por corrida, por si ya hay datos)
+    corrida = secrets.token_hex(3)
+    for i, (fecha, hora) in enumerate(futuros):
+        yield _fila_turno(fecha, hora, aleatorio.choice(servicios), f'reserva-{corrida}-{i:06d}', 'reservado', aleatorio)
+
+
+# Generar datos de ejemplo: negocio (si falta), servicios y turnos
+# Inserta los turnos de a lotes (un INSERT con muchas filas y un commit por lote)
+# Retorna un resumen con lo generado
+def generar_datos(turnos, servicios=10, dias_historia=365, dias_futuro=30, ocupacion=0.6,
+                  lote=5000, semilla=None, limpiar=False, progreso=None):
+    aleatorio = random.Random(semilla)
+    
+    if limpiar:
+        limpiar_datos()
+    
+    plantillas = _asegurar_negocio()
+    ids_servicios = _asegurar_servicios(servicios)
+    
+    tabla = Turno.__table__
+    insertados = 0
+    filas = []
+    
+    for fila in _generar_turnos(turnos, dias_historia, dias_futuro, ocupacion, plantillas, ids_servicios, aleatorio):
+        filas.append(fila)
+        if len(filas) >= lote:
+            db.session.execute(insert(tabla), filas)
+            db.session.commit()
+            insertados += len(filas)
+            filas = []
+            if progreso:
+                progreso(insertados)
+    
+    if filas:
+        db.session.execute(insert(tabla), filas)
+        db.session.commit()
+        insertados += len(filas)
+        if progreso:
+            progreso(insertados)
+    
+    # Los contadores por día y la cache de turno activo tienen que reflejar lo insertado
+    dias = TurnoService.recalcular_contadores()
+    cache_turno_activo.limpiar()
+    
+    return {'turnos': insertados, 'servicios': len(ids_servicios), 'dias_con_turnos': dias}
+
+
+# flask seed --turnos 100k
+@click.command('seed')
+@click.option('--turnos', default='10k', show_default=True, help='Cantidad de turnos (ej: 10k, 100k, 1M).')
+@click.option('--servicios', default=10, show_default=True, help='Servicios activos a tener.')
+@click.option('--dias-historia', default=365, show_default=True, help='Días hacia atrás para los turnos pasados.')
+@click.option('--dias-futuro', default=30, show_default=True, help='Días hacia adelante con turnos reservados.')
+@click.option('--ocupacion', default=0.6, show_default=True, help='Fracción de horarios futuros reservados (0 a 1).')
+@click.option('--lote', default=5000, show_default=True, help='Filas por INSERT / commit.')
+@click.option('--semilla', type=int, default=None, help='Semilla aleatoria (para repetir los mismos datos).')
+@click.option('--limpiar', is_flag=True, help='Borrar turnos y servicios existentes antes de generar.')
+@with_appcontext
+def seed_cli(turnos, servicios, dias_historia, dias_futuro, ocupacion, lote, semilla, limpiar):
+    """Generar datos de ejemplo (negocio, servicios y turnos) para pruebas de carga."""
+    cantidad = parsear_cantidad(turnos)
+    inicio = datetime.now()
+    
+    resumen = generar_datos(
+        cantidad,
+        servicios=servicios,
+        dias_historia=dias_historia,
+        dias_futuro=dias_futuro,
+        ocupacion=ocupacion,
+        lote=lote,
+        semilla=semilla,
+        limpiar=limpiar,
+        progreso=lambda hechos: click.echo(f'  {hechos:,} / {cantidad:,} turnos', err=True)
+    )
+    
+    segundos = (datetime.now() - inicio).total_seconds()
+    click.echo(
+        f"Listo: {resumen['turnos']:,} turnos, {resumen['servicios']} servicios, "
+        f"{resumen['dias_con_turnos']} días con turnos ({segundos:.1f} s)"
+    )
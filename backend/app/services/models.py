@@ -18,8 +18,8 @@ class Servicio(db.Model):
             'id': self.id,
             'nombre_servicio': self.nombre_servicio,
             'categoria': self.categoria,
-            'precio': float(self.precio) if self.precio else 0.0,
+            'precio': self.precio if self.precio is not None else 0.0,
             'activo': self.activo,
-            'creado_en': self.creado_en.isoformat() if self.creado_en else None,
-            'actualizado_en': self.actualizado_en.isoformat() if self.actualizado_en else None,
+            'creado_en': self.creado_en,
+            'actualizado_en': self.actualizado_en,
         }
\ No newline at end of file
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.services.service import ServicioService
+from app.presupuesto_consultas import presupuesto_consultas
 
 # Blueprint para servicios
 servicios_bp = Blueprint('servicios', __name__, url_prefix='/api/servicios')
@@ -8,6 +9,7 @@ servicios_bp = Blueprint('servicios', __name__, url_prefix='/api/servicios')
 # Obtener todos los servicios
 @servicios_bp.route('/', methods=['GET'])
 @jwt_required()
+@presupuesto_consultas(1)
 def obtener_servicios():
     servicios = ServicioService.obtener_todos_servicios()
     servicios_dict = [s.to_dict() for s in servicios]
@@ -49,6 +51,7 @@ def eliminar_servicio(servicio_id):
     return jsonify(resultado), status_code
 
 # Guardar múltiples servicios
+# Body: servicios (lista), eliminar_faltantes (opcional, por defecto false)
 @servicios_bp.route('/guardar-multiples', methods=['POST'])
 @jwt_required()
 def guardar_servicios():
@@ -56,6 +59,10 @@ def guardar_servicios():
     if not data or 'servicios' not in data:
         return jsonify({'success': False, 'mensaje': 'Falta información de servicios'}), 400
     
-    resultado = ServicioService.guardar_servicios(data['servicios'])
+    # eliminar_faltantes: borrar los servicios que no vienen en la lista
+    resultado = ServicioService.guardar_servicios(
+        data['servicios'],
+        eliminar_faltantes=data.get('eliminar_faltantes', False)
+    )
     status_code = 200 if resultado['success'] else 400
     return jsonify(resultado), status_code
\ No newline at end of file
@@ -1,9 +1,10 @@
 from app.services.models import Servicio
 from app.database import db
+from sqlalchemy import delete, select, union, update
 from datetime import datetime, time, timedelta
 
 class ServicioService:
-    
+
     @staticmethod
     def obtener_todos_servicios():
         """Obtener todos los servicios ordenados por categoría y nombre"""
@@ -62,12 +63,17 @@ class ServicioService:
     
     @staticmethod
     def eliminar_servicio(servicio_id):
-        """Eliminar un servicio"""
+        """Eliminar un servicio (si tiene turnos, activos o archivados, se desactiva)"""
         try:
             servicio = Servicio.query.get(servicio_id)
             if not servicio:
                 return {'success': False, 'mensaje': 'Servicio no encontrado'}
             
+            if ServicioService._servicios_con_turnos([servicio.id]):
+                servicio.activo = False
+                db.session.commit()
+                return {'success': True, 'mensaje': 'El servicio tiene turnos: se desactivó en vez de eliminarse'}
+            
             db.session.delete(servicio)
             db.session.commit()
             return {'success': True, 'mensaje': 'Servicio eliminado correctamente'}
@@ -76,30 +82,114 @@ class ServicioService:
             return {'success': False, 'mensaje': f'Error al eliminar servicio: {str(e)}'}
     
     @staticmethod
-    def guardar_servicios(servicios_data):
-        """Guardar/actualizar múltiples servicios"""
+    def guardar_servicios(servicios_data, eliminar_faltantes=False):
+        """Guardar/actualizar múltiples servicios
+        
+        Trae todos los servicios a actualizar con una sola consulta (IN) e
+        inserta los nuevos en tanda. Con eliminar_faltantes, los servicios que
+        no vienen en la lista se borran en la misma transacción (los que tienen
+        turnos asociados no se pueden borrar: se desactivan).
+        """
         try:
+            ids = [s['id'] for s in servicios_data if s.get('id')]
+            
+            # SELECT * FROM servicios WHERE id IN (...)
+            existentes = {}
+            if ids:
+                existentes = {
+                    servicio.id: servicio
+                    for servicio in Servicio.query.filter(Servicio.id.in_(ids)).all()
+                }
+            
+            actualizados = 0
+            nuevos = []
+            
             for servicio_data in servicios_data:
                 if servicio_data.get('id'):
                     # Actualizar servicio existente
-                    servicio = Servicio.query.get(servicio_data['id'])
+                    servicio = existentes.get(servicio_data['id'])
                     if servicio:
                         servicio.nombre_servicio = servicio_data['nombre_servicio']
                         servicio.categoria = servicio_data['categoria']
                         servicio.precio = servicio_data['precio']
                         servicio.activo = servicio_data.get('activo', True)
+                        actualizados += 1
                 else:
                     # Crear nuevo servicio
-                    servicio = Servicio(
+                    nuevos.append(Servicio(
                         nombre_servicio=servicio_data['nombre_servicio'],
                         categoria=servicio_data['categoria'],
                         precio=servicio_data['precio'],
                         activo=servicio_data.get('activo', True)
-                    )
-                    db.session.add(servicio)
+                    ))
+            
+            # Los faltantes se buscan antes de agregar los nuevos: si no, el
+            # autoflush los inserta y (como no están en ids) también se borrarían
+            eliminados = 0
+            desactivados = 0
+            if eliminar_faltantes:
+                eliminados, desactivados = ServicioService._eliminar_faltantes(ids)
+            
+            # Los nuevos se insertan juntos en el flush
+            db.session.add_all(nuevos)
             
             db.session.commit()
-            return {'success': True, 'mensaje': 'Servicios guardados correctamente'}
+            return {
+                'success': True,
+                'mensaje': 'Servicios guardados correctamente',
+                'creados': len(nuevos),
+                'actualizados': actualizados,
+                'eliminados': eliminados,
+                'desactivados': desactivados
+            }
         except Exception as e:
             db.session.rollback()
-            return {'success': False, 'mensaje': f'Error al guardar servicios: {str(e)}'}
\ No newline at end of file
+            return {'success': False, 'mensaje': f'Error al guardar servicios: {str(e)}'}
+    
+    @staticmethod
+    def _eliminar_faltantes(ids_conservados):
+        """Borrar los servicios que no están en ids_conservados
+        
+        Los que tienen turnos asociados se desactivan en vez de borrarse.
+        Retorna (eliminados, desactivados).
+        """
+        faltantes = Servicio.query.with_entities(Servicio.id)\
+            .filter(Servicio.id.notin_(ids_conservados)).all()
+        faltantes = [fila.id for fila in faltantes]
+        
+        if not faltantes:
+            return 0, 0
+        
+        # Servicios faltantes que tienen turnos (no se pueden borrar por la FK)
+        con_turnos = ServicioService._servicios_con_turnos(faltantes)
+        
+        a_borrar = [servicio_id for servicio_id in faltantes if servicio_id not in con_turnos]
+        
+        if a_borrar:
+            db.session.execute(
+                delete(Servicio).where(Servicio.id.in_(a_borrar)),
+                execution_options={'synchronize_session': False}
+            )
+        
+        if con_turnos:
+            db.session.execute(
+                update(Servicio).where(Servicio.id.in_(con_turnos)).values(activo=False),
+                execution_options={'synchronize_session': False}
+            )
+        
+        return len(a_borrar), len(con_turnos)
+    
+    @staticmethod
+    def _servicios_con_turnos(servicio_ids):
+        """Ids (de servicio_ids) que tienen turnos en turnos o en turnos_historico
+        
+        Las dos tablas tienen FK a servicios: esos servicios no se pueden borrar.
+        """
+        # Import local: app.management importa servicios
+        from app.management.models import GestionTurnos, GestionTurnosHistorico
+        
+        consulta = union(
+            select(GestionTurnos.servicio_id).where(GestionTurnos.servicio_id.in_(servicio_ids)),
+            select(GestionTurnosHistorico.servicio_id).where(GestionTurnosHistorico.servicio_id.in_(servicio_ids))
+        )
+        return set(db.session.scalars(consulta))
@@ -0,0 +1,115 @@
+"""Benchmark del arranque de la app.
+
+Mide, en procesos nuevos (sin módulos ya cargados):
+  - cuánto tarda importar el paquete app
+  - cuánto tarda create_app()
+  - los módulos que más tardan en importarse (python -X importtime)
+
+Uso (desde backend/):
+    python benchmarks/arranque.py
+    python benchmarks/arranque.py --repeticiones 20 --top 15 --json arranque.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Código que corre en cada proceso hijo: imprime los tiempos en JSON
+MEDIR = '''
+import json, time
+inicio = time.perf_counter()
+from app import create_app
+importado = time.perf_counter()
+create_app()
+fin = time.perf_counter()
+print(json.dumps({'importar': importado - inicio, 'create_app': fin - importado, 'total': fin - inicio}))
+'''
+
+
+# Entorno de los procesos hijos: sin migrar al arrancar y con una BD de ejemplo
+# (create_app no se conecta, así que no hace falta que exista)
+def _entorno():
+    entorno = dict(os.environ)
+    entorno.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.gettempdir(), 'benchmark-arranque.db'))
+    entorno['DB_MIGRAR_AL_ARRANCAR'] = '0'
+    return entorno
+
+
+# Correr create_app() en un proceso nuevo y devolver los tiempos (en segundos)
+def medir_una_vez():
+    salida = subprocess.run(
+        [sys.executable, '-c', MEDIR],
+        cwd=BACKEND, env=_entorno(), capture_output=True, text=True, check=True
+    )
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+# Correr "python -X importtime" y devolver los módulos que más tardan (acumulado)
+def modulos_mas_lentos(top):
+    salida = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'from app import create_app; create_app()'],
+        cwd=BACKEND, env=_entorno(), capture_output=True, text=True, check=True
+    )
+    
+    modulos = []
+    for linea in salida.stderr.splitlines():
+        # Formato: "import time: self [us] | cumulative | imported package"
+        if not linea.startswith('import time:') or 'cumulative' in linea:
+            continue
+        propio, acumulado, nombre = (parte.strip() for parte in linea[len('import time:'):].split('|'))
+        modulos.append({'modulo': nombre, 'propio_ms': int(propio) / 1000, 'acumulado_ms': int(acumulado) / 1000})
+    
+    # Ordenados por tiempo acumulado (el módulo más todo lo que importa)
+    return sorted(modulos, key=lambda m: m['acumulado_ms'], reverse=True)[:top]
+
+
+def _resumen(valores):
+    return {
+        'min_ms': round(min(valores) * 1000, 2),
+        'mediana_ms': round(statistics.median(valores) * 1000, 2),
+        'max_ms': round(max(valores) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark del arranque de la app (create_app e imports).')
+    parser.add_argument('--repeticiones', type=int, default=10, help='cantidad de procesos a medir (default 10)')
+    parser.add_argument('--top', type=int, default=10, help='módulos más lentos a mostrar (default 10)')
+    parser.add_argument('--json', dest='archivo_json', help='guardar el resultado en este archivo')
+    args = parser.parse_args()
+    
+    # La primera corrida compila los .pyc: no se cuenta
+    medir_una_vez()
+    
+    corridas = [medir_una_vez() for _ in range(args.repeticiones)]
+    resultado = {
+        'python': sys.version.split()[0],
+        'repeticiones': args.repeticiones,
+        'importar': _resumen([c['importar'] for c in corridas]),
+        'create_app': _resumen([c['create_app'] for c in corridas]),
+        'total': _resumen([c['total'] for c in corridas]),
+        'modulos_mas_lentos': modulos_mas_lentos(args.top),
+    }
+    
+    print(f"Arranque ({args.repeticiones} procesos, Python {resultado['python']})")
+    for etapa in ('importar', 'create_app', 'total'):
+        r = resultado[etapa]
+        print(f"  {etapa:<11} mediana {r['mediana_ms']:>8.1f} ms   (min {r['min_ms']:.1f} / max {r['max_ms']:.1f})")
+    
+    print('\nMódulos más lentos (python -X importtime, acumulado):')
+    for m in resultado['modulos_mas_lentos']:
+        print(f"  {m['acumulado_ms']:>8.1f} ms  {m['modulo']}")
+    
+    if args.archivo_json:
+        with open(args.archivo_json, 'w') as archivo:
+            json.dump(resultado, archivo, indent=2)
+        print(f'\nResultado guardado en {args.archivo_json}')
+
+
+if __name__ == '__main__':
+    main()
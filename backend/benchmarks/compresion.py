@@ -0,0 +1,138 @@
+"""Benchmark de la compresión de respuestas (bytes y CPU por endpoint).
+
+Crea una BD SQLite temporal con datos de ejemplo, pide cada endpoint sin comprimir
+y mide cuánto ocupa y cuánto CPU cuesta comprimir el cuerpo con gzip (varios niveles)
+y con brotli (si está instalado).
+
+Uso (desde backend/):
+    python benchmarks/compresion.py
+    python benchmarks/compresion.py --turnos 2000 --repeticiones 50
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, time as hora, timedelta
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+# La config se lee al importar la app: primero la BD temporal
+_directorio = tempfile.mkdtemp(prefix='benchmark-compresion-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_directorio, 'benchmark.db')
+os.environ['DB_MIGRAR_AL_ARRANCAR'] = '1'
+os.environ['COMPRESION_ACTIVA'] = '0'  # se piden los cuerpos sin comprimir y se comprimen acá
+
+from app import create_app
+from app.appointments.models import Turno
+from app.auth.models import Usuario
+from app.business.service import NegocioService
+from app.compresion import brotli, comprimir
+from app.database import db
+from app.services.models import Servicio
+
+ESTADOS = ('reservado', 'completado', 'cancelado', 'no-show')
+
+
+# Cargar configuración, servicios y turnos de ejemplo
+def cargar_datos(app, cantidad_turnos):
+    with app.app_context():
+        usuario = Usuario(nombre_usuario='benchmark')
+        usuario.establecer_contrasena('benchmark')
+        db.session.add(usuario)
+        
+        NegocioService.guardar_configuracion_completa({
+            'nombre': 'Negocio de prueba',
+            'intervalo_turnos': 30,
+            'max_turnos': 20,
+            'horarios': [
+                {'dia_semana': dia, 'hora_apertura': '09:00', 'hora_cierre': '18:00', 'abierto': dia < 6}
+                for dia in range(7)
+            ],
+        })
+        
+        servicios = [Servicio(nombre_servicio=f'Servicio {i}', categoria='General', precio=1000 + i * 250) for i in range(5)]
+        db.session.add_all(servicios)
+        db.session.flush()
+        
+        # 18 horarios por día; un solo turno reservado por cliente
+        hoy = date.today()
+        db.session.add_all([
+            Turno(
+                fecha=hoy + timedelta(days=i // 18),
+                hora=hora(9 + (i % 18) // 2, 30 * (i % 2)),
+                servicio_id=servicios[i % len(servicios)].id,
+                nombre_cliente=f'Cliente {i}',
+                telefono_cliente=f'11{i:08d}',
+                client_id=f'cliente-{i:08d}',
+                estado=ESTADOS[i % len(ESTADOS)],
+            )
+            for i in range(cantidad_turnos)
+        ])
+        db.session.commit()
+        
+        return (hoy + timedelta(days=cantidad_turnos // 18 + 1)).isoformat()
+
+
+# Medir bytes y CPU de comprimir un cuerpo con una codificación y nivel
+def medir(cuerpo, codificacion, nivel, repeticiones):
+    inicio = time.process_time()
+    for _ in range(repeticiones):
+        comprimido = comprimir(cuerpo, codificacion, nivel_gzip=nivel, nivel_brotli=nivel)
+    cpu = (time.process_time() - inicio) / repeticiones
+    return len(comprimido), cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de la compresión de respuestas.')
+    parser.add_argument('--turnos', type=int, default=1000, help='turnos de ejemplo (default 1000)')
+    parser.add_argument('--repeticiones', type=int, default=20, help='compresiones por medición (default 20)')
+    args = parser.parse_args()
+    
+    logging.disable(logging.INFO)
+    app = create_app()
+    hasta = cargar_datos(app, args.turnos)
+    desde = date.today().isoformat()
+    cliente = app.test_client()
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        token = cliente.post('/api/auth/login', json={'nombre_usuario': 'benchmark', 'contrasena': 'benchmark'}).json['token']
+    headers = {'Authorization': f'Bearer {token}'}
+    
+    endpoints = [
+        '/api/business/horarios',
+        '/api/management/turnos?limit=200',
+        f'/api/appointments/turnos?fecha_inicio={desde}&fecha_fin={hasta}',
+        f'/api/management/turnos/export?desde={desde}&hasta={hasta}&formato=csv',
+        f'/api/management/turnos/export?desde={desde}&hasta={hasta}&formato=ndjson',
+    ]
+    
+    codificaciones = [('gzip', 1), ('gzip', 6), ('gzip', 9)]
+    if brotli is not None:
+        codificaciones += [('br', 4), ('br', 11)]
+    else:
+        print('brotli no está instalado: solo se mide gzip (pip install brotli)')
+    
+    print(f'{args.turnos} turnos de ejemplo, {args.repeticiones} compresiones por medición\n')
+    for url in endpoints:
+        cuerpo = cliente.get(url, headers=headers).get_data()
+        nombre = url.split('?')[0] + (f" ({url.rsplit('=', 1)[1]})" if 'formato=' in url else '')
+        print(f'{nombre}  {len(cuerpo):,} bytes sin comprimir')
+        
+        for codificacion, nivel in codificaciones:
+            tamano, cpu = medir(cuerpo, codificacion, nivel, args.repeticiones)
+            print(f'  {codificacion:<4} nivel {nivel:<2}  {tamano:>10,} bytes  {tamano / len(cuerpo):>6.1%}  {cpu * 1000:>8.2f} ms CPU')
+        print()
+    
+    with app.app_context():
+        db.engine.dispose()
+    shutil.rmtree(_directorio, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+"""Benchmark de los endpoints principales a distintas escalas de datos.
+
+Para cada escala (cantidad de turnos) genera datos con el mismo generador que
+"flask seed" y mide latencia (p50 / p95 / máx) y cantidad de consultas SQL de
+cada endpoint. El resultado se puede guardar en JSON para comparar corridas.
+
+Por defecto usa una BD SQLite temporal. Con --database-url se puede usar otra
+(por ejemplo un Postgres local): OJO, se borran sus turnos y servicios.
+
+Uso (desde backend/):
+    python benchmarks/endpoints.py
+    python benchmarks/endpoints.py --escalas 10k,100k,1M --dias-historia 1825 --json resultados.json
+    python benchmarks/endpoints.py --database-url postgresql://localhost/turnos_bench
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+
+def _argumentos():
+    parser = argparse.ArgumentParser(description='Benchmark de endpoints a distintas escalas de datos.')
+    parser.add_argument('--escalas', default='10k,100k', help='cantidades de turnos separadas por coma (default 10k,100k)')
+    parser.add_argument('--repeticiones', type=int, default=30, help='requests medidos por endpoint (default 30)')
+    parser.add_argument('--dias-historia', type=int, default=365, help='días de historia de los turnos pasados (default 365)')
+    parser.add_argument('--database-url', help='BD a usar (default: SQLite temporal)')
+    parser.add_argument('--semilla', type=int, default=1, help='semilla de los datos generados (default 1)')
+    parser.add_argument('--json', dest='archivo_json', help='guardar el resultado en este archivo')
+    return parser.parse_args()
+
+
+ARGS = _argumentos()
+
+# La config se lee al importar la app: primero la BD
+_directorio = None
+if not ARGS.database_url:
+    _directorio = tempfile.mkdtemp(prefix='benchmark-endpoints-')
+    ARGS.database_url = 'sqlite:///' + os.path.join(_directorio, 'benchmark.db')
+os.environ['DATABASE_URL'] = ARGS.database_url
+os.environ['DB_MIGRAR_AL_ARRANCAR'] = '1'
+
+from sqlalchemy import select
+from app import create_app
+from app.appointments.service import cache_turno_activo
+from app.auth.models import Usuario
+from app.business.service import NegocioService
+from app.database import db
+from app.presupuesto_consultas import contar_consultas
+from app.seed import generar_datos, parsear_cantidad
+from app.services.models import Servicio
+
+DIAS_FUTURO = 30
+
+
+# Endpoints a medir: (nombre, método, función que arma la url y el body para la repetición i)
+def endpoints(hoy, reservas):
+    manana = (hoy + timedelta(days=1)).isoformat()
+    return [
+        ('horarios-disponibles', 'GET', lambda i: (f'/api/appointments/horarios-disponibles?fecha={manana}', None)),
+        ('proximo-disponible', 'GET', lambda i: ('/api/appointments/proximo-disponible', None)),
+        ('disponibilidad (30 días)', 'GET', lambda i: (
+            f'/api/appointments/disponibilidad?desde={manana}&hasta={(hoy + timedelta(days=30)).isoformat()}', None
+        )),
+        ('reservar', 'POST', lambda i: ('/api/appointments/reservar', reservas[i])),
+        ('management/turnos', 'GET', lambda i: ('/api/management/turnos', None)),
+        ('management/turnos (completados)', 'GET', lambda i: ('/api/management/turnos?estado=completado', None)),
+        ('management/turnos/hoy', 'GET', lambda i: ('/api/management/turnos/hoy', None)),
+        ('appointments/turnos (último mes)', 'GET', lambda i: (
+            f'/api/appointments/turnos?fecha_inicio={(hoy - timedelta(days=30)).isoformat()}'
+            f'&fecha_fin={hoy.isoformat()}&estado=completado', None
+        )),
+    ]
+
+
+# Horarios libres para reservar (después de los días con datos generados)
+# Uno por request, respetando max_turnos por día
+def reservas_libres(cantidad, servicio_id, hoy):
+    plantillas = NegocioService.construir_plantillas()
+    por_dia = plantillas['max_turnos'] or 10 ** 9
+    
+    reservas = []
+    fecha = hoy + timedelta(days=DIAS_FUTURO + 1)
+    while len(reservas) < cantidad:
+        for hora in list(plantillas['slots'].get(fecha.weekday()) or ())[:por_dia]:
+            reservas.append({
+                'fecha': fecha.isoformat(),
+                'hora': hora,
+                'servicio_id': servicio_id,
+                'nombre_cliente': 'Cliente benchmark',
+                'telefono_cliente': '1100000000',
+                'client_id': f'benchmark-{fecha.isoformat()}-{hora}',
+            })
+        fecha += timedelta(days=1)
+    
+    return reservas[:cantidad]
+
+
+# Medir un endpoint: un request de calentamiento y después "repeticiones" medidos
+def medir_endpoint(cliente, headers, metodo, armar, repeticiones):
+    tiempos = []
+    consultas = []
+    
+    for i in range(repeticiones + 1):
+        url, body = armar(i)
+        with contar_consultas() as registro:
+            inicio = time.perf_counter()
+            respuesta = cliente.open(url, method=metodo, json=body, headers=headers)
+            segundos = time.perf_counter() - inicio
+        
+        if respuesta.status_code >= 400:
+            raise RuntimeError(f'{metodo} {url} -> {respuesta.status_code}: {respuesta.get_data(as_text=True)[:200]}')
+        if i == 0:
+            continue  # calentamiento (caches vacías)
+        
+        tiempos.append(segundos)
+        consultas.append(registro.total)
+    
+    tiempos.sort()
+    return {
+        'p50_ms': round(statistics.median(tiempos) * 1000, 2),
+        'p95_ms': round(tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))] * 1000, 2),
+        'max_ms': round(tiempos[-1] * 1000, 2),
+        'media_ms': round(statistics.mean(tiempos) * 1000, 2),
+        'consultas': statistics.median(consultas),
+        'consultas_max': max(consultas),
+    }
+
+
+def main():
+    logging.disable(logging.WARNING)
+    app = create_app()
+    cliente = app.test_client()
+    
+    with app.app_context():
+        if not Usuario.query.filter_by(nombre_usuario='benchmark').first():
+            usuario = Usuario(nombre_usuario='benchmark')
+            usuario.establecer_contrasena('benchmark')
+            db.session.add(usuario)
+            db.session.commit()
+        dialecto = db.engine.dialect.name
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        token = cliente.post('/api/auth/login', json={'nombre_usuario': 'benchmark', 'contrasena': 'benchmark'}).json['token']
+    headers = {'Authorization': f'Bearer {token}'}
+    
+    resultado = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'base_de_datos': dialecto,
+        'repeticiones': ARGS.repeticiones,
+        'dias_historia': ARGS.dias_historia,
+        'escalas': {},
+    }
+    
+    for escala in ARGS.escalas.split(','):
+        cantidad = parsear_cantidad(escala)
+        hoy = date.today()
+        
+        with app.app_context():
+            inicio = time.perf_counter()
+            resumen = generar_datos(
+                cantidad,
+                dias_historia=ARGS.dias_historia,
+                dias_futuro=DIAS_FUTURO,
+                semilla=ARGS.semilla,
+                limpiar=True
+            )
+            carga = time.perf_counter() - inicio
+            NegocioService.invalidar_cache_slots()
+            cache_turno_activo.limpiar()
+            servicio_id = db.session.scalar(select(Servicio.id).where(Servicio.activo.is_(True)).order_by(Servicio.id))
+            reservas = reservas_libres(ARGS.repeticiones + 1, servicio_id, hoy)
+        
+        print(f'\n{cantidad:,} turnos ({resumen["dias_con_turnos"]} días con turnos, generados en {carga:.1f} s)')
+        print(f'  {"endpoint":<34} {"p50":>9} {"p95":>9} {"máx":>9} {"consultas":>10}')
+        
+        medidas = {}
+        for nombre, metodo, armar in endpoints(hoy, reservas):
+            medida = medir_endpoint(cliente, headers, metodo, armar, ARGS.repeticiones)
+            medidas[nombre] = medida
+            print(
+                f'  {nombre:<34} {medida["p50_ms"]:>7.2f}ms {medida["p95_ms"]:>7.2f}ms '
+                f'{medida["max_ms"]:>7.2f}ms {medida["consultas"]:>10g}'
+            )
+        
+        resultado['escalas'][str(cantidad)] = {
+            'turnos': resumen['turnos'],
+            'dias_con_turnos': resumen['dias_con_turnos'],
+            'generacion_s': round(carga, 2),
+            'endpoints': medidas,
+        }
+    
+    if ARGS.archivo_json:
+        with open(ARGS.archivo_json, 'w') as archivo:
+            json.dump(resultado, archivo, indent=2, ensure_ascii=False)
+        print(f'\nResultado guardado en {ARGS.archivo_json}')
+    
+    with app.app_context():
+        db.engine.dispose()
+    if _directorio:
+        shutil.rmtree(_directorio, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
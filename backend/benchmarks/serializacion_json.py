@@ -0,0 +1,110 @@
+"""Micro-benchmark de la serialización JSON de las respuestas.
+
+Compara, sobre una lista de turnos como la de /api/management/turnos:
+  - antes:    to_dict con isoformat()/float() + el proveedor por defecto de Flask
+  - json:     ProveedorJSON sin orjson (librería estándar, convierte fechas y Decimal)
+  - orjson:   ProveedorJSON con orjson (si está instalado)
+
+Uso (desde backend/):
+    python benchmarks/serializacion_json.py
+    python benchmarks/serializacion_json.py --turnos 200 --repeticiones 2000
+"""
+import argparse
+import os
+import sys
+import timeit
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from app.json_provider import ProveedorJSON, orjson
+
+
+# Lista de turnos con los mismos campos (y tipos) que GestionTurnos.to_dict()
+def armar_turnos(cantidad):
+    ahora = datetime(2025, 1, 1, 12, 30, 15, 123456)
+    return [
+        {
+            'id': i,
+            'fecha': date(2025, 1, 1) + timedelta(days=i % 60),
+            'hora': time(9 + i % 9, 30 * (i % 2)),
+            'servicio_id': i % 10,
+            'nombre_servicio': 'Corte de pelo',
+            'categoria_servicio': 'Peluquería',
+            'precio_servicio': Decimal('1500.50'),
+            'nombre_cliente': f'Cliente número {i}',
+            'telefono_cliente': '1155550000',
+            'client_id': f'client-{i:08d}',
+            'estado': 'reservado',
+            'creado_en': ahora,
+            'actualizado_en': ahora,
+        }
+        for i in range(cantidad)
+    ]
+
+
+# Cómo se armaba antes: to_dict ya convertía todo a texto / float
+def pre_convertir(turnos):
+    return [
+        {
+            **turno,
+            'fecha': turno['fecha'].isoformat(),
+            'hora': str(turno['hora']),
+            'precio_servicio': float(turno['precio_servicio']),
+            'creado_en': turno['creado_en'].isoformat(),
+            'actualizado_en': turno['actualizado_en'].isoformat(),
+        }
+        for turno in turnos
+    ]
+
+
+# ProveedorJSON sin orjson (mismas conversiones, librería estándar)
+class ProveedorSoloJSON(ProveedorJSON):
+
+    def dumps(self, obj, **kwargs):
+        return DefaultJSONProvider.dumps(self, obj, **kwargs)
+    
+    def response(self, *args, **kwargs):
+        return DefaultJSONProvider.response(self, *args, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmark de la serialización JSON.')
+    parser.add_argument('--turnos', type=int, default=50, help='turnos por respuesta (default 50, el límite por página)')
+    parser.add_argument('--repeticiones', type=int, default=1000, help='respuestas a serializar por caso (default 1000)')
+    args = parser.parse_args()
+    
+    app = Flask(__name__)
+    turnos = armar_turnos(args.turnos)
+    
+    por_defecto = DefaultJSONProvider(app)
+    casos = {
+        'antes (to_dict + json)': lambda: por_defecto.response({'success': True, 'turnos': pre_convertir(turnos)}),
+    }
+    
+    solo_json = ProveedorSoloJSON(app)
+    casos['ProveedorJSON (json)'] = lambda: solo_json.response({'success': True, 'turnos': turnos})
+    
+    if orjson is not None:
+        proveedor = ProveedorJSON(app)
+        casos['ProveedorJSON (orjson)'] = lambda: proveedor.response({'success': True, 'turnos': turnos})
+    else:
+        print('orjson no está instalado: se omite ese caso (pip install orjson)\n')
+    
+    with app.app_context():
+        tamano = len(casos['antes (to_dict + json)']().get_data())
+        print(f'{args.turnos} turnos por respuesta (~{tamano / 1024:.1f} KB), {args.repeticiones} respuestas\n')
+        
+        base = None
+        for nombre, caso in casos.items():
+            segundos = min(timeit.repeat(caso, number=args.repeticiones, repeat=3))
+            por_respuesta = segundos / args.repeticiones * 1e6
+            base = base or por_respuesta
+            print(f'  {nombre:<26} {por_respuesta:>9.1f} µs/respuesta   x{base / por_respuesta:.2f}')
+
+
+if __name__ == '__main__':
+    main()
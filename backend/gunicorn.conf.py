@@ -0,0 +1,45 @@
+import multiprocessing
+import os
+
+# Configuración de gunicorn (producción)
+# Uso: gunicorn -c gunicorn.conf.py wsgi:app
+# Todo se puede ajustar con variables de entorno
+
+cpus = multiprocessing.cpu_count()
+
+# Dirección donde escucha
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', 5000)}")
+
+# Procesos: la regla habitual es (2 x CPUs) + 1
+workers = int(os.getenv('WEB_CONCURRENCY', cpus * 2 + 1))
+
+# Hilos por proceso: la app pasa la mayor parte del tiempo esperando a la BD
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+# Cargar la app una sola vez antes de crear los workers (arranque más rápido y menos memoria)
+preload_app = os.getenv('GUNICORN_PRELOAD', '1') == '1'
+
+# Tiempos (en segundos)
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))  # worker colgado -> se reinicia
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))  # para terminar los requests en curso
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))  # conexiones keep-alive (detrás de un proxy)
+
+# Reciclar workers cada tanto para evitar que crezca la memoria
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+# Logs a stdout/stderr
+accesslog = os.getenv('GUNICORN_ACCESSLOG', '-')
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOGLEVEL', 'info')
+
+
+# Con preload_app la app se crea en el proceso padre:
+# cada worker descarta las conexiones heredadas y abre las suyas
+def post_fork(server, worker):
+    from app.database import db
+    from wsgi import app
+    
+    with app.app_context():
+        db.engine.dispose(close=False)
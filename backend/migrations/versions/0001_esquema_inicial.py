@@ -0,0 +1,97 @@
+"""esquema inicial (equivalente al viejo db.create_all())
+
+Revision ID: 0001_esquema_inicial
+Revises: 
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_esquema_inicial'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+# Las bases creadas antes de las migraciones ya tienen estas tablas
+# (las creaba db.create_all() al arrancar), así que solo creamos las que faltan
+def _existe_tabla(nombre):
+    return sa.inspect(op.get_bind()).has_table(nombre)
+
+
+def upgrade():
+    if not _existe_tabla('usuarios'):
+        op.create_table(
+            'usuarios',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('nombre_usuario', sa.String(length=80), nullable=False),
+            sa.Column('contrasena', sa.String(length=255), nullable=False),
+            sa.Column('creado_en', sa.DateTime(), nullable=False),
+            sa.Column('actualizado_en', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('nombre_usuario')
+        )
+
+    if not _existe_tabla('negocio'):
+        op.create_table(
+            'negocio',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('nombre', sa.String(length=100), nullable=False),
+            sa.Column('telefono', sa.String(length=30), nullable=True),
+            sa.Column('email', sa.String(length=100), nullable=True),
+            sa.Column('direccion', sa.String(length=200), nullable=True),
+            sa.Column('duracion_turno', sa.Integer(), nullable=True),
+            sa.Column('intervalo_turnos', sa.Integer(), nullable=True),
+            sa.Column('max_turnos', sa.Integer(), nullable=True),
+            sa.Column('dia_semana', sa.Integer(), nullable=True),
+            sa.Column('hora_apertura', sa.TIME(), nullable=True),
+            sa.Column('hora_cierre', sa.TIME(), nullable=True),
+            sa.Column('hora_descanso_inicio', sa.TIME(), nullable=True),
+            sa.Column('hora_descanso_fin', sa.TIME(), nullable=True),
+            sa.Column('abierto', sa.Boolean(), nullable=True),
+            sa.Column('creado_en', sa.DateTime(), nullable=True),
+            sa.Column('actualizado_en', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+    if not _existe_tabla('servicios'):
+        op.create_table(
+            'servicios',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('nombre_servicio', sa.String(length=100), nullable=False),
+            sa.Column('categoria', sa.String(length=100), nullable=False),
+            sa.Column('precio', sa.Numeric(precision=10, scale=2), nullable=False),
+            sa.Column('activo', sa.Boolean(), nullable=False),
+            sa.Column('creado_en', sa.DateTime(), nullable=True),
+            sa.Column('actualizado_en', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+    if not _existe_tabla('turnos'):
+        op.create_table(
+            'turnos',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('fecha', sa.Date(), nullable=False),
+            sa.Column('hora', sa.Time(), nullable=False),
+            sa.Column('servicio_id', sa.Integer(), nullable=False),
+            sa.Column('nombre_cliente', sa.String(length=120), nullable=False),
+            sa.Column('telefono_cliente', sa.String(length=30), nullable=False),
+            sa.Column('client_id', sa.String(length=100), nullable=False),
+            sa.Column('estado', sa.String(length=20), nullable=False),
+            sa.Column('token_cancelacion', sa.String(length=200), nullable=False),
+            sa.Column('creado_en', sa.DateTime(), nullable=True),
+            sa.Column('actualizado_en', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['servicio_id'], ['servicios.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('token_cancelacion')
+        )
+
+
+def downgrade():
+    op.drop_table('turnos')
+    op.drop_table('servicios')
+    op.drop_table('negocio')
+    op.drop_table('usuarios')
@@ -0,0 +1,53 @@
+"""índices compuestos para las consultas frecuentes sobre turnos
+
+Revision ID: 0002_indices_turnos
+Revises: 0001_esquema_inicial
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_indices_turnos'
+down_revision = '0001_esquema_inicial'
+branch_labels = None
+depends_on = None
+
+
+# Motores que soportan índices parciales (CREATE INDEX ... WHERE ...)
+MOTORES_CON_INDICE_PARCIAL = ('postgresql', 'sqlite')
+
+SOLO_RESERVADOS = sa.text("estado = 'reservado'")
+
+
+def _soporta_indice_parcial():
+    return op.get_bind().dialect.name in MOTORES_CON_INDICE_PARCIAL
+
+
+def upgrade():
+    # Listados por fecha / rangos de fechas (gestión, obtener_turnos_rango)
+    op.create_index('ix_turnos_fecha_hora', 'turnos', ['fecha', 'hora'])
+
+    if _soporta_indice_parcial():
+        # Disponibilidad: horas reservadas de una fecha o de un rango
+        op.create_index(
+            'ix_turnos_reservados_fecha_hora', 'turnos', ['fecha', 'hora'],
+            postgresql_where=SOLO_RESERVADOS, sqlite_where=SOLO_RESERVADOS
+        )
+        # Turno activo de un cliente (obtener_turno_activo)
+        op.create_index(
+            'ix_turnos_reservados_client', 'turnos', ['client_id'],
+            postgresql_where=SOLO_RESERVADOS, sqlite_where=SOLO_RESERVADOS
+        )
+    else:
+        # Sin índices parciales (MySQL): el estado va como columna del índice
+        op.create_index('ix_turnos_reservados_fecha_hora', 'turnos', ['estado', 'fecha', 'hora'])
+        op.create_index('ix_turnos_reservados_client', 'turnos', ['client_id', 'estado'])
+
+
+def downgrade():
+    op.drop_index('ix_turnos_reservados_client', table_name='turnos')
+    op.drop_index('ix_turnos_reservados_fecha_hora', table_name='turnos')
+    op.drop_index('ix_turnos_fecha_hora', table_name='turnos')
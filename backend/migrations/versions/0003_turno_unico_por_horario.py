@@ -0,0 +1,74 @@
+"""un solo turno reservado por fecha y hora
+
+Revision ID: 0003_turno_unico_por_horario
+Revises: 0002_indices_turnos
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_turno_unico_por_horario'
+down_revision = '0002_indices_turnos'
+branch_labels = None
+depends_on = None
+
+
+MOTORES_CON_INDICE_PARCIAL = ('postgresql', 'sqlite')
+
+SOLO_RESERVADOS = sa.text("estado = 'reservado'")
+
+
+def _verificar_sin_duplicados():
+    # Si ya hay horarios reservados dos veces, el índice único no se puede crear
+    duplicados = op.get_bind().execute(sa.text(
+        "SELECT fecha, hora, COUNT(*) FROM turnos "
+        "WHERE estado = 'reservado' "
+        "GROUP BY fecha, hora HAVING COUNT(*) > 1"
+    )).fetchall()
+
+    if duplicados:
+        detalle = ', '.join(f'{fecha} {hora} ({cantidad})' for fecha, hora, cantidad in duplicados)
+        raise RuntimeError(
+            f'Hay horarios con más de un turno reservado: {detalle}. '
+            'Cancelá los sobrantes antes de aplicar esta migración.'
+        )
+
+
+def upgrade():
+    _verificar_sin_duplicados()
+
+    op.drop_index('ix_turnos_reservados_fecha_hora', table_name='turnos')
+
+    if op.get_bind().dialect.name in MOTORES_CON_INDICE_PARCIAL:
+        op.create_index(
+            'uq_turnos_reservados_fecha_hora', 'turnos', ['fecha', 'hora'], unique=True,
+            postgresql_where=SOLO_RESERVADOS, sqlite_where=SOLO_RESERVADOS
+        )
+    else:
+        # MySQL no tiene índices parciales: usamos una columna generada que vale 1
+        # si el turno está reservado y NULL si no (los NULL no chocan en un UNIQUE)
+        op.add_column('turnos', sa.Column(
+            'reservado_flag', sa.SmallInteger(),
+            sa.Computed("CASE WHEN estado = 'reservado' THEN 1 ELSE NULL END"),
+            nullable=True
+        ))
+        op.create_index(
+            'uq_turnos_reservados_fecha_hora', 'turnos', ['fecha', 'hora', 'reservado_flag'], unique=True
+        )
+        # El índice compuesto sigue sirviendo para las consultas de disponibilidad
+        op.create_index('ix_turnos_reservados_fecha_hora', 'turnos', ['estado', 'fecha', 'hora'])
+
+
+def downgrade():
+    op.drop_index('uq_turnos_reservados_fecha_hora', table_name='turnos')
+
+    if op.get_bind().dialect.name in MOTORES_CON_INDICE_PARCIAL:
+        op.create_index(
+            'ix_turnos_reservados_fecha_hora', 'turnos', ['fecha', 'hora'],
+            postgresql_where=SOLO_RESERVADOS, sqlite_where=SOLO_RESERVADOS
+        )
+    else:
+        op.drop_column('turnos', 'reservado_flag')
@@ -0,0 +1,37 @@
+"""contador de turnos por día (turnos_por_dia)
+
+Revision ID: 0004_turnos_por_dia
+Revises: 0003_turno_unico_por_horario
+Create Date: 2026-10-18 11:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_turnos_por_dia'
+down_revision = '0003_turno_unico_por_horario'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'turnos_por_dia',
+        sa.Column('fecha', sa.Date(), nullable=False),
+        sa.Column('reservados', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('fecha')
+    )
+
+    # Cargamos los contadores con los turnos que ya existen
+    op.execute(
+        "INSERT INTO turnos_por_dia (fecha, reservados) "
+        "SELECT fecha, COUNT(*) FROM turnos "
+        "WHERE estado != 'cancelado' "
+        "GROUP BY fecha"
+    )
+
+
+def downgrade():
+    op.drop_table('turnos_por_dia')
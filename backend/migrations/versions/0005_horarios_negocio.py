@@ -0,0 +1,96 @@
+"""separar la configuración general (negocio) de los horarios por día (horarios_negocio)
+
+Revision ID: 0005_horarios_negocio
+Revises: 0004_turnos_por_dia
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_horarios_negocio'
+down_revision = '0004_turnos_por_dia'
+branch_labels = None
+depends_on = None
+
+
+COLUMNAS_HORARIO = [
+    'dia_semana', 'hora_apertura', 'hora_cierre',
+    'hora_descanso_inicio', 'hora_descanso_fin', 'abierto',
+]
+
+
+def upgrade():
+    op.create_table(
+        'horarios_negocio',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('dia_semana', sa.Integer(), nullable=False),
+        sa.Column('hora_apertura', sa.TIME(), nullable=True),
+        sa.Column('hora_cierre', sa.TIME(), nullable=True),
+        sa.Column('hora_descanso_inicio', sa.TIME(), nullable=True),
+        sa.Column('hora_descanso_fin', sa.TIME(), nullable=True),
+        sa.Column('abierto', sa.Boolean(), nullable=True),
+        sa.Column('creado_en', sa.DateTime(), nullable=True),
+        sa.Column('actualizado_en', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('dia_semana')
+    )
+
+    conexion = op.get_bind()
+
+    # Copiamos el horario de cada día (si un día estaba repetido, gana la primera fila)
+    conexion.execute(sa.text(
+        "INSERT INTO horarios_negocio "
+        "(dia_semana, hora_apertura, hora_cierre, hora_descanso_inicio, hora_descanso_fin, "
+        "abierto, creado_en, actualizado_en) "
+        "SELECT dia_semana, hora_apertura, hora_cierre, hora_descanso_inicio, hora_descanso_fin, "
+        "abierto, creado_en, actualizado_en "
+        "FROM negocio WHERE id IN ("
+        "SELECT MIN(id) FROM negocio WHERE dia_semana IS NOT NULL GROUP BY dia_semana)"
+    ))
+
+    # La configuración general se repetía en todas las filas: dejamos solo la
+    # más reciente (la que se guardó última)
+    fila_general = conexion.execute(sa.text(
+        "SELECT id FROM negocio ORDER BY actualizado_en DESC, id DESC"
+    )).first()
+
+    if fila_general:
+        conexion.execute(
+            sa.text("DELETE FROM negocio WHERE id <> :id"),
+            {'id': fila_general.id}
+        )
+
+    with op.batch_alter_table('negocio') as batch_op:
+        for columna in COLUMNAS_HORARIO:
+            batch_op.drop_column(columna)
+
+
+def downgrade():
+    with op.batch_alter_table('negocio') as batch_op:
+        batch_op.add_column(sa.Column('dia_semana', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('hora_apertura', sa.TIME(), nullable=True))
+        batch_op.add_column(sa.Column('hora_cierre', sa.TIME(), nullable=True))
+        batch_op.add_column(sa.Column('hora_descanso_inicio', sa.TIME(), nullable=True))
+        batch_op.add_column(sa.Column('hora_descanso_fin', sa.TIME(), nullable=True))
+        batch_op.add_column(sa.Column('abierto', sa.Boolean(), nullable=True))
+
+    conexion = op.get_bind()
+
+    # Volvemos a una fila por día, repitiendo la configuración general en cada una
+    conexion.execute(sa.text(
+        "INSERT INTO negocio "
+        "(nombre, telefono, email, direccion, duracion_turno, intervalo_turnos, max_turnos, "
+        "dia_semana, hora_apertura, hora_cierre, hora_descanso_inicio, hora_descanso_fin, "
+        "abierto, creado_en, actualizado_en) "
+        "SELECT n.nombre, n.telefono, n.email, n.direccion, n.duracion_turno, "
+        "n.intervalo_turnos, n.max_turnos, "
+        "h.dia_semana, h.hora_apertura, h.hora_cierre, h.hora_descanso_inicio, "
+        "h.hora_descanso_fin, h.abierto, h.creado_en, h.actualizado_en "
+        "FROM horarios_negocio h CROSS JOIN negocio n"
+    ))
+    conexion.execute(sa.text("DELETE FROM negocio WHERE dia_semana IS NULL"))
+
+    op.drop_table('horarios_negocio')
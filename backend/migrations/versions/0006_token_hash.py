@@ -0,0 +1,77 @@
+"""guardar el hash SHA-256 del token de cancelación en vez del token
+
+Revision ID: 0006_token_hash
+Revises: 0005_horarios_negocio
+Create Date: 2026-10-18 12:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import hashlib
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_token_hash'
+down_revision = '0005_horarios_negocio'
+branch_labels = None
+depends_on = None
+
+
+TAMANO_TANDA = 1000
+
+
+def upgrade():
+    op.add_column('turnos', sa.Column('token_hash', sa.String(length=64), nullable=True))
+
+    # Hasheamos los tokens existentes: los links de cancelación que ya se
+    # mandaron siguen funcionando (el token recibido se hashea y se busca)
+    conexion = op.get_bind()
+    ultimo_id = 0
+
+    while True:
+        filas = conexion.execute(
+            sa.text(
+                "SELECT id, token_cancelacion FROM turnos "
+                "WHERE id > :ultimo_id ORDER BY id LIMIT :limite"
+            ),
+            {'ultimo_id': ultimo_id, 'limite': TAMANO_TANDA}
+        ).fetchall()
+
+        if not filas:
+            break
+
+        conexion.execute(
+            sa.text("UPDATE turnos SET token_hash = :token_hash WHERE id = :id"),
+            [
+                {'id': fila.id, 'token_hash': hashlib.sha256(fila.token_cancelacion.encode()).hexdigest()}
+                for fila in filas
+            ]
+        )
+        ultimo_id = filas[-1].id
+
+    with op.batch_alter_table('turnos') as batch_op:
+        batch_op.alter_column('token_hash', existing_type=sa.String(length=64), nullable=False)
+        batch_op.create_unique_constraint('uq_turnos_token_hash', ['token_hash'])
+        batch_op.drop_column('token_cancelacion')
+
+
+def downgrade():
+    # Los tokens originales no se pueden recuperar: los links de cancelación
+    # quedan inválidos y cada turno recibe un token nuevo (el hash no sirve como token)
+    import secrets
+
+    op.add_column('turnos', sa.Column('token_cancelacion', sa.String(length=200), nullable=True))
+
+    conexion = op.get_bind()
+    ids = [fila.id for fila in conexion.execute(sa.text("SELECT id FROM turnos")).fetchall()]
+    if ids:
+        conexion.execute(
+            sa.text("UPDATE turnos SET token_cancelacion = :token WHERE id = :id"),
+            [{'id': turno_id, 'token': secrets.token_urlsafe(150)} for turno_id in ids]
+        )
+
+    with op.batch_alter_table('turnos') as batch_op:
+        batch_op.alter_column('token_cancelacion', existing_type=sa.String(length=200), nullable=False)
+        batch_op.create_unique_constraint('turnos_token_cancelacion_key', ['token_cancelacion'])
+        batch_op.drop_constraint('uq_turnos_token_hash', type_='unique')
+        batch_op.drop_column('token_hash')
@@ -0,0 +1,66 @@
+"""un solo turno reservado por cliente
+
+Revision ID: 0007_turno_activo_unico_por_cliente
+Revises: 0006_token_hash
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_turno_activo_unico_por_cliente'
+down_revision = '0006_token_hash'
+branch_labels = None
+depends_on = None
+
+
+MOTORES_CON_INDICE_PARCIAL = ('postgresql', 'sqlite')
+
+SOLO_RESERVADOS = sa.text("estado = 'reservado'")
+
+
+def _verificar_sin_duplicados():
+    # Si algún cliente ya tiene dos turnos reservados, el índice único no se puede crear
+    duplicados = op.get_bind().execute(sa.text(
+        "SELECT client_id, COUNT(*) FROM turnos "
+        "WHERE estado = 'reservado' "
+        "GROUP BY client_id HAVING COUNT(*) > 1"
+    )).fetchall()
+
+    if duplicados:
+        detalle = ', '.join(f'{client_id} ({cantidad})' for client_id, cantidad in duplicados)
+        raise RuntimeError(
+            f'Hay clientes con más de un turno reservado: {detalle}. '
+            'Cancelá los sobrantes antes de aplicar esta migración.'
+        )
+
+
+def upgrade():
+    _verificar_sin_duplicados()
+
+    op.drop_index('ix_turnos_reservados_client', table_name='turnos')
+
+    if op.get_bind().dialect.name in MOTORES_CON_INDICE_PARCIAL:
+        op.create_index(
+            'uq_turnos_reservados_client', 'turnos', ['client_id'], unique=True,
+            postgresql_where=SOLO_RESERVADOS, sqlite_where=SOLO_RESERVADOS
+        )
+    else:
+        # MySQL: reservado_flag (migración 0003) vale NULL si el turno no está reservado
+        op.create_index(
+            'uq_turnos_reservados_client', 'turnos', ['client_id', 'reservado_flag'], unique=True
+        )
+
+
+def downgrade():
+    op.drop_index('uq_turnos_reservados_client', table_name='turnos')
+
+    if op.get_bind().dialect.name in MOTORES_CON_INDICE_PARCIAL:
+        op.create_index(
+            'ix_turnos_reservados_client', 'turnos', ['client_id'],
+            postgresql_where=SOLO_RESERVADOS, sqlite_where=SOLO_RESERVADOS
+        )
+    else:
+        op.create_index('ix_turnos_reservados_client', 'turnos', ['client_id', 'estado'])
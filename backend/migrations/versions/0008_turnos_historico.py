@@ -0,0 +1,44 @@
+"""tabla turnos_historico para archivar turnos terminados
+
+Revision ID: 0008_turnos_historico
+Revises: 0007_turno_activo_unico_por_cliente
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008_turnos_historico'
+down_revision = '0007_turno_activo_unico_por_cliente'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Mismas columnas que turnos (sin token_hash) + archivado_en
+    # El id del turno va en turno_id (no es único: turnos puede reusar ids borrados)
+    op.create_table(
+        'turnos_historico',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('turno_id', sa.Integer(), nullable=False),
+        sa.Column('fecha', sa.Date(), nullable=False),
+        sa.Column('hora', sa.Time(), nullable=False),
+        sa.Column('servicio_id', sa.Integer(), nullable=False),
+        sa.Column('nombre_cliente', sa.String(length=120), nullable=False),
+        sa.Column('telefono_cliente', sa.String(length=30), nullable=False),
+        sa.Column('client_id', sa.String(length=100), nullable=False),
+        sa.Column('estado', sa.String(length=20), nullable=False),
+        sa.Column('creado_en', sa.DateTime(), nullable=True),
+        sa.Column('actualizado_en', sa.DateTime(), nullable=True),
+        sa.Column('archivado_en', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['servicio_id'], ['servicios.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_turnos_historico_fecha_hora', 'turnos_historico', ['fecha', 'hora'])
+
+
+def downgrade():
+    op.drop_index('ix_turnos_historico_fecha_hora', table_name='turnos_historico')
+    op.drop_table('turnos_historico')
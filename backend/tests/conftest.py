@@ -0,0 +1,79 @@
+import os
+import shutil
+import sys
+import tempfile
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+# La config se lee al importar la app: BD SQLite temporal con las migraciones
+# aplicadas al arrancar y el presupuesto de consultas en modo "fallar"
+# (una vista que se pasa de su @presupuesto_consultas responde 500)
+_directorio = tempfile.mkdtemp(prefix='tests-turnos-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_directorio, 'tests.db')
+os.environ['DB_MIGRAR_AL_ARRANCAR'] = '1'
+os.environ['PRESUPUESTO_CONSULTAS_ACTIVO'] = '1'
+os.environ['PRESUPUESTO_CONSULTAS_MODO'] = 'fallar'
+
+from app import create_app
+from app.appointments.service import cache_turno_activo
+from app.auth.models import Usuario
+from app.auth.service import cache_usuarios
+from app.business.service import NegocioService
+from app.database import db
+from app.seed import CONFIGURACION_EJEMPLO
+
+
+@pytest.fixture(scope='session')
+def app():
+    app = create_app()
+    yield app
+    
+    with app.app_context():
+        db.engine.dispose()
+    shutil.rmtree(_directorio, ignore_errors=True)
+
+
+# Cada test arranca con las tablas vacías y las caches limpias
+@pytest.fixture(autouse=True)
+def limpiar(app):
+    yield
+    
+    with app.app_context():
+        db.session.rollback()
+        for tabla in reversed(db.metadata.sorted_tables):
+            db.session.execute(tabla.delete())
+        db.session.commit()
+    
+    cache_turno_activo.limpiar()
+    cache_usuarios.limpiar()
+    NegocioService.invalidar_cache_slots()
+
+
+@pytest.fixture
+def cliente(app):
+    return app.test_client()
+
+
+# Negocio configurado (lunes a sábado, 9 a 19 con descanso al mediodía)
+@pytest.fixture
+def negocio(app):
+    with app.app_context():
+        resultado = NegocioService.guardar_configuracion_completa(CONFIGURACION_EJEMPLO)
+        assert resultado['success'], resultado
+    
+    NegocioService.invalidar_cache_slots()
+
+
+# Headers con el JWT de un usuario admin
+@pytest.fixture
+def headers_admin(app, cliente):
+    with app.app_context():
+        usuario = Usuario(nombre_usuario='admin')
+        usuario.establecer_contrasena('admin')
+        db.session.add(usuario)
+        db.session.commit()
+    
+    respuesta = cliente.post('/api/auth/login', json={'nombre_usuario': 'admin', 'contrasena': 'admin'})
+    return {'Authorization': f"Bearer {respuesta.json['token']}"}
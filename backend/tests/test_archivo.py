@@ -0,0 +1,56 @@
+from datetime import date, datetime, time, timedelta
+from app.appointments.models import Turno, TurnoHistorico
+from app.appointments.service import TurnoService
+from app.database import db
+from app.services.models import Servicio
+
+
+def _turno_pasado(servicio_id, dias, estado='completado'):
+    return Turno(
+        fecha=date.today() - timedelta(days=dias),
+        hora=time(10, 0),
+        servicio_id=servicio_id,
+        nombre_cliente='Cliente',
+        telefono_cliente='1100000000',
+        client_id=f'cliente-{dias}',
+        estado=estado,
+        creado_en=datetime.utcnow(),
+    )
+
+
+def _archivar_todo(corte):
+    total = 0
+    ultimo_id = 0
+    while True:
+        cantidad, ultimo_id = TurnoService.archivar_lote(corte, lote=2, despues_de_id=ultimo_id)
+        if not cantidad:
+            return total
+        total += cantidad
+
+
+# SQLite reusa los ids más altos borrados: un turno nuevo puede tener el id
+# de uno ya archivado y el siguiente archivo no tiene que fallar
+def test_archivar_con_ids_reusados(app):
+    with app.app_context():
+        servicio = Servicio(nombre_servicio='Corte', categoria='Peluquería', precio=1000)
+        db.session.add(servicio)
+        db.session.commit()
+        servicio_id = servicio.id
+        
+        db.session.add_all([_turno_pasado(servicio_id, dias) for dias in (100, 120, 140)])
+        db.session.commit()
+        corte = date.today() - timedelta(days=90)
+        assert _archivar_todo(corte) == 3
+        db.session.expunge_all()
+        
+        reusado = _turno_pasado(servicio_id, 200, estado='no-show')
+        db.session.add(reusado)
+        db.session.commit()
+        reusado_id = reusado.id
+        
+        assert _archivar_todo(corte) == 1
+        assert db.session.scalar(db.select(db.func.count()).select_from(Turno)) == 0
+        
+        archivados = db.session.scalars(db.select(TurnoHistorico).order_by(TurnoHistorico.historico_id)).all()
+        assert [t.estado for t in archivados] == ['completado'] * 3 + ['no-show']
+        assert reusado_id in {t.id for t in archivados[:3]}
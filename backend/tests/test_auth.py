@@ -0,0 +1,35 @@
+from datetime import datetime
+from sqlalchemy import update
+from app.auth.models import Usuario
+from app.database import db
+
+
+# /me sale de los claims: con la cache confirmando la versión no consulta la BD
+def test_me_desde_claims(cliente, headers_admin):
+    primera = cliente.get('/api/auth/me', headers=headers_admin)
+    segunda = cliente.get('/api/auth/me', headers=headers_admin)
+    
+    assert primera.status_code == 200
+    assert primera.json == segunda.json
+    assert primera.json['usuario']['nombre_usuario'] == 'admin'
+    assert segunda.headers['X-Consultas-SQL'] == '0'
+
+
+# Si otro worker modificó el usuario (sin invalidar la cache de este proceso),
+# un token nuevo no recibe el perfil viejo cacheado
+def test_me_con_cache_vieja_de_otro_worker(app, cliente, headers_admin):
+    cliente.get('/api/auth/me', headers=headers_admin)
+    
+    # UPDATE directo: no dispara los eventos del ORM que invalidan la cache
+    with app.app_context():
+        db.session.execute(
+            update(Usuario.__table__).values(nombre_usuario='jefe', actualizado_en=datetime.utcnow())
+        )
+        db.session.commit()
+    
+    respuesta = cliente.post('/api/auth/login', json={'nombre_usuario': 'jefe', 'contrasena': 'admin'})
+    headers_nuevo = {'Authorization': f"Bearer {respuesta.json['token']}"}
+    
+    assert cliente.get('/api/auth/me', headers=headers_nuevo).json['usuario']['nombre_usuario'] == 'jefe'
+    # El token viejo también recibe el perfil actual (no sus claims desactualizados)
+    assert cliente.get('/api/auth/me', headers=headers_admin).json['usuario']['nombre_usuario'] == 'jefe'
@@ -0,0 +1,182 @@
+import csv
+import io
+import json
+from datetime import date, time, timedelta
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.exc import OperationalError
+from app.appointments.models import Turno, TurnosPorDia
+from app.appointments.service import TurnoService
+from app.database import db
+from app.management.service import GestionTurnosService
+from app.presupuesto_consultas import contar_consultas
+from app.services.models import Servicio
+
+
+# N turnos de hoy repartidos entre varios servicios
+def _crear_turnos(cantidad, servicios=3):
+    ids = []
+    for i in range(servicios):
+        servicio = Servicio(nombre_servicio=f'Servicio {i}', categoria='Peluquería', precio=1000 + i)
+        db.session.add(servicio)
+        db.session.flush()
+        ids.append(servicio.id)
+    
+    db.session.add_all([
+        Turno(
+            fecha=date.today(),
+            hora=time(9 + i % 10, 0),
+            servicio_id=ids[i % servicios],
+            nombre_cliente=f'Cliente {i}',
+            telefono_cliente='1100000000',
+            client_id=f'cliente-{i}',
+            estado='completado',
+        )
+        for i in range(cantidad)
+    ])
+    db.session.commit()
+    db.session.expunge_all()  # como en un request nuevo: sin servicios en memoria
+
+
+# Listar y serializar (to_dict usa el servicio de cada turno) es un solo SELECT, sea cual sea N
+@pytest.mark.parametrize('cantidad', [5, 40])
+def test_listados_de_gestion_un_solo_select(app, cantidad):
+    with app.app_context():
+        _crear_turnos(cantidad)
+        
+        with contar_consultas() as registro:
+            turnos, _ = GestionTurnosService.obtener_todos_turnos(limite=200)
+            listado = [t.to_dict() for t in turnos]
+        assert len(listado) == cantidad
+        assert {t['nombre_servicio'] for t in listado} == {'Servicio 0', 'Servicio 1', 'Servicio 2'}
+        assert registro.total == 1
+        
+        db.session.expunge_all()
+        with contar_consultas() as registro:
+            listado = [t.to_dict() for t in GestionTurnosService.obtener_turnos_hoy()]
+        assert len(listado) == cantidad
+        assert registro.total == 1
+
+
+def _contadores():
+    return dict(db.session.execute(select(TurnosPorDia.fecha, TurnosPorDia.reservados)).all())
+
+
+# Cancelar y "des-cancelar" en masa ajusta turnos_por_dia con un solo UPDATE,
+# y completar un turno cancelado también le devuelve su lugar
+def test_contadores_al_cambiar_estado_desde_cancelado(app):
+    dia_1 = date.today() + timedelta(days=1)
+    dia_2 = date.today() + timedelta(days=2)
+    
+    with app.app_context():
+        servicio = Servicio(nombre_servicio='Corte', categoria='Peluquería', precio=1000)
+        db.session.add(servicio)
+        db.session.flush()
+        turnos = [
+            Turno(fecha=fecha, hora=time(9 + i, 0), servicio_id=servicio.id, nombre_cliente='Cliente',
+                  telefono_cliente='1100000000', client_id=f'cliente-{fecha}-{i}')
+            for fecha, cantidad in ((dia_1, 3), (dia_2, 2))
+            for i in range(cantidad)
+        ]
+        db.session.add_all(turnos)
+        db.session.commit()
+        ids = [turno.id for turno in turnos]
+        TurnoService.recalcular_contadores()
+        
+        assert GestionTurnosService.cambiar_estado_masivo('cancelado', ids=ids)['success']
+        assert _contadores() == {dia_1: 0, dia_2: 0}
+        
+        with contar_consultas() as registro:
+            resultado = GestionTurnosService.cambiar_estado_masivo('completado', ids=ids[1:])
+        assert resultado['actualizados'] == 4
+        assert _contadores() == {dia_1: 2, dia_2: 2}
+        assert sum(sql.startswith('UPDATE turnos_por_dia') for sql, _ in registro.consultas) == 1
+        
+        assert GestionTurnosService.marcar_como_completado(ids[0])['success']
+        assert _contadores() == {dia_1: 3, dia_2: 2}
+
+
+# Por la ruta (con el presupuesto y el detector de N+1 en modo "fallar"):
+# cambiar turnos de muchos días distintos no repite consultas por día
+def test_cambio_de_estado_masivo_de_muchos_dias(app, cliente, headers_admin):
+    dias = [date.today() + timedelta(days=i) for i in range(1, 7)]
+    
+    with app.app_context():
+        servicio = Servicio(nombre_servicio='Corte', categoria='Peluquería', precio=1000)
+        db.session.add(servicio)
+        db.session.flush()
+        turnos = [
+            Turno(fecha=fecha, hora=time(10, 0), servicio_id=servicio.id, nombre_cliente='Cliente',
+                  telefono_cliente='1100000000', client_id=f'cliente-{fecha}')
+            for fecha in dias
+        ]
+        db.session.add_all(turnos)
+        db.session.commit()
+        ids = [turno.id for turno in turnos]
+        TurnoService.recalcular_contadores()
+    
+    for estado, reservados in (('cancelado', 0), ('completado', 1)):
+        respuesta = cliente.put('/api/management/turnos/estado', json={'estado': estado, 'ids': ids}, headers=headers_admin)
+        assert respuesta.status_code == 200, respuesta.get_data(as_text=True)
+        assert respuesta.json['actualizados'] == len(ids)
+        
+        with app.app_context():
+            assert _contadores() == {fecha: reservados for fecha in dias}
+            
+            # Días sin fila en turnos_por_dia: al volver a ocupar lugar se crean
+            if estado == 'cancelado':
+                db.session.execute(delete(TurnosPorDia).where(TurnosPorDia.fecha.in_(dias[:3])))
+                db.session.commit()
+
+
+# El export serializa igual que el resto de la API: precio numérico, texto sin
+# escapar y fechas en ISO 8601 (también en el CSV)
+def test_export_serializa_como_la_api(app, cliente, headers_admin):
+    hoy = date.today().isoformat()
+    with app.app_context():
+        servicio = Servicio(nombre_servicio='Diseño de barba', categoria='Barbería', precio=1500.5)
+        db.session.add(servicio)
+        db.session.flush()
+        db.session.add(Turno(fecha=date.today(), hora=time(10, 30), servicio_id=servicio.id,
+                             nombre_cliente='Begoña Muñoz', telefono_cliente='1100000000', client_id='cliente'))
+        db.session.commit()
+    
+    api = cliente.get('/api/management/turnos', headers=headers_admin).json['turnos'][0]
+    
+    ndjson = cliente.get(f'/api/management/turnos/export?desde={hoy}&hasta={hoy}&formato=ndjson', headers=headers_admin)
+    linea = ndjson.get_data(as_text=True).splitlines()[0]
+    fila = json.loads(linea)
+    assert 'Begoña Muñoz' in linea and 'Diseño de barba' in linea
+    assert fila['precio_servicio'] == api['precio_servicio'] == 1500.5
+    assert fila['creado_en'] == api['creado_en']
+    assert (fila['fecha'], fila['hora']) == (api['fecha'], api['hora'])
+    
+    texto = cliente.get(f'/api/management/turnos/export?desde={hoy}&hasta={hoy}', headers=headers_admin).get_data(as_text=True)
+    fila_csv = next(csv.DictReader(io.StringIO(texto)))
+    assert fila_csv['creado_en'] == api['creado_en']
+    assert (fila_csv['fecha'], fila_csv['hora']) == (api['fecha'], api['hora'])
+
+
+# Una fecha mal escrita es un 400 (como desde / hasta / cursor), no una lista vacía
+def test_listado_valida_el_filtro_fecha(app, cliente, headers_admin):
+    with app.app_context():
+        _crear_turnos(2)
+    
+    respuesta = cliente.get('/api/management/turnos?fecha=18-10-2026', headers=headers_admin)
+    assert respuesta.status_code == 400
+    
+    respuesta = cliente.get(f'/api/management/turnos?fecha={date.today().isoformat()}', headers=headers_admin)
+    assert respuesta.status_code == 200
+    assert respuesta.json['total'] == 2
+
+
+# Un error de la BD es un 500: no una última página vacía (el panel dejaría de paginar
+# creyendo que ya trajo todo)
+def test_listado_no_tapa_errores_de_la_bd(cliente, headers_admin, monkeypatch):
+    def fallar(*args, **kwargs):
+        raise OperationalError('SELECT ...', {}, Exception('se cayó la conexión'))
+    
+    monkeypatch.setattr(GestionTurnosService, '_pagina_turnos', staticmethod(fallar))
+    
+    respuesta = cliente.get('/api/management/turnos', headers=headers_admin)
+    assert respuesta.status_code == 500
@@ -0,0 +1,27 @@
+from datetime import date, timedelta
+import pytest
+from app.business.service import NegocioService
+
+
+def _vistas_publicas():
+    manana = date.today() + timedelta(days=1)
+    return [
+        f'/api/appointments/horarios-disponibles?fecha={manana.isoformat()}',
+        '/api/appointments/proximo-disponible',
+        f'/api/appointments/disponibilidad?desde={manana.isoformat()}&hasta={(manana + timedelta(days=13)).isoformat()}',
+    ]
+
+
+# Con la plantilla de slots sin cachear (primer request de cada worker, o después
+# de guardar la configuración) la vista tiene que entrar igual en su presupuesto
+# (los tests corren con PRESUPUESTO_CONSULTAS_MODO=fallar: si se pasa, responde 500)
+@pytest.mark.parametrize('url', _vistas_publicas())
+def test_vistas_publicas_en_presupuesto_con_cache_fria_y_caliente(cliente, negocio, url):
+    NegocioService.invalidar_cache_slots()
+    
+    fria = cliente.get(url)
+    caliente = cliente.get(url)
+    
+    assert fria.status_code == 200, fria.get_data(as_text=True)
+    assert caliente.status_code == 200, caliente.get_data(as_text=True)
+    assert int(caliente.headers['X-Consultas-SQL']) < int(fria.headers['X-Consultas-SQL'])
@@ -0,0 +1,57 @@
+from datetime import date, time
+from app.appointments.models import TurnoHistorico
+from app.database import db
+from app.services.models import Servicio
+from app.services.service import ServicioService
+
+
+def _servicio(nombre, **datos):
+    return {'nombre_servicio': nombre, 'categoria': 'Peluquería', 'precio': 1000, **datos}
+
+
+# Los servicios nuevos no son "faltantes": no se tienen que borrar en el mismo guardado
+def test_guardar_servicios_no_borra_los_nuevos_con_eliminar_faltantes(app):
+    with app.app_context():
+        existente = Servicio(nombre_servicio='Corte', categoria='Peluquería', precio=1000)
+        sobrante = Servicio(nombre_servicio='Barba', categoria='Barbería', precio=800)
+        db.session.add_all([existente, sobrante])
+        db.session.commit()
+        existente_id = existente.id
+        db.session.expunge_all()  # como en un request nuevo
+        
+        resultado = ServicioService.guardar_servicios(
+            [_servicio('Corte', id=existente_id), _servicio('Color'), _servicio('Mechas')],
+            eliminar_faltantes=True
+        )
+        
+        assert resultado['success'], resultado
+        assert (resultado['creados'], resultado['eliminados']) == (2, 1)
+        nombres = sorted(db.session.scalars(db.select(Servicio.nombre_servicio)))
+        assert nombres == ['Color', 'Corte', 'Mechas']
+
+
+# Un servicio que solo tienen turnos archivados tampoco se puede borrar (FK de turnos_historico)
+def test_servicio_con_turnos_archivados_se_desactiva(app):
+    with app.app_context():
+        archivado = Servicio(nombre_servicio='Corte', categoria='Peluquería', precio=1000)
+        otro = Servicio(nombre_servicio='Barba', categoria='Barbería', precio=800)
+        db.session.add_all([archivado, otro])
+        db.session.commit()
+        archivado_id, otro_id = archivado.id, otro.id
+        
+        db.session.add(TurnoHistorico(
+            id=1, fecha=date(2025, 1, 10), hora=time(10, 0), servicio_id=archivado_id,
+            nombre_cliente='Cliente', telefono_cliente='1100000000', client_id='cliente', estado='completado'
+        ))
+        db.session.commit()
+        db.session.expunge_all()
+        
+        resultado = ServicioService.guardar_servicios([_servicio('Barba', id=otro_id)], eliminar_faltantes=True)
+        assert (resultado['eliminados'], resultado['desactivados']) == (0, 1)
+        assert db.session.get(Servicio, archivado_id).activo is False
+        
+        db.session.get(Servicio, archivado_id).activo = True
+        db.session.commit()
+        resultado = ServicioService.eliminar_servicio(archivado_id)
+        assert resultado['success'], resultado
+        assert db.session.get(Servicio, archivado_id).activo is False
@@ -0,0 +1,150 @@
+from datetime import date, timedelta
+import threading
+import pytest
+from sqlalchemy import delete, func, select
+from app.appointments.models import Turno, TurnosPorDia
+from app.appointments.service import TurnoService
+from app.business.service import NegocioService
+from app.database import db
+from app.presupuesto_consultas import contar_consultas
+from app.seed import CONFIGURACION_EJEMPLO
+from app.services.models import Servicio
+
+
+# Próximo día abierto (lunes a sábado) a partir de mañana
+def _proximo_dia_habil():
+    fecha = date.today() + timedelta(days=1)
+    while fecha.weekday() == 6:
+        fecha += timedelta(days=1)
+    return fecha
+
+
+# Configuración del negocio con un horario corrido (sin descanso) todos los días hábiles
+def _configurar_negocio(apertura, cierre, intervalo, max_turnos=None):
+    datos = dict(CONFIGURACION_EJEMPLO, intervalo_turnos=intervalo, duracion_turno=intervalo, max_turnos=max_turnos)
+    datos['horarios'] = [
+        dict(horario, hora_apertura=apertura, hora_cierre=cierre, hora_descanso_inicio=None, hora_descanso_fin=None)
+        for horario in CONFIGURACION_EJEMPLO['horarios']
+    ]
+    resultado = NegocioService.guardar_configuracion_completa(datos)
+    assert resultado['success'], resultado
+    NegocioService.invalidar_cache_slots()
+
+
+# La cantidad de consultas de horarios-disponibles no depende de cuántos slots tiene el día
+@pytest.mark.parametrize('cache_caliente', [False, True])
+def test_horarios_disponibles_consultas_independientes_de_los_slots(app, cache_caliente):
+    fecha = _proximo_dia_habil()
+    consultas = {}
+    
+    with app.app_context():
+        servicio = Servicio(nombre_servicio='Corte', categoria='Peluquería', precio=1000)
+        db.session.add(servicio)
+        db.session.commit()
+        
+        for apertura, cierre, intervalo, cantidad in (('09:00', '13:00', 30, 8), ('08:00', '18:00', 15, 40)):
+            _configurar_negocio(apertura, cierre, intervalo)
+            
+            # Un par de horarios reservados
+            for i, hora in enumerate(('09:00', '10:00')):
+                resultado = TurnoService.crear_turno(
+                    fecha.isoformat(), hora, servicio.id, 'Cliente', '1100000000', f'cliente-{cantidad}-{i}'
+                )
+                assert resultado['success'], resultado
+            
+            if cache_caliente:
+                TurnoService.obtener_horarios_disponibles(fecha)
+            else:
+                NegocioService.invalidar_cache_slots()
+            
+            with contar_consultas() as registro:
+                horarios = TurnoService.obtener_horarios_disponibles(fecha)
+            
+            assert len(horarios) == cantidad
+            assert sum(not h['disponible'] for h in horarios) == 2
+            consultas[cantidad] = registro.total
+            
+            # Sin turnos para la próxima configuración
+            db.session.execute(delete(Turno))
+            db.session.execute(delete(TurnosPorDia))
+            db.session.commit()
+    
+    assert consultas[8] == consultas[40]
+
+
+# Reservar desde varios hilos a la vez (cada uno con su request, su sesión y su conexión)
+# Retorna [(status, json), ...] en el orden de "reservas"
+def _reservar_en_paralelo(app, reservas):
+    barrera = threading.Barrier(len(reservas))
+    respuestas = [None] * len(reservas)
+    
+    def reservar(i):
+        cliente = app.test_client()
+        barrera.wait()
+        respuesta = cliente.post('/api/appointments/reservar', json=reservas[i])
+        respuestas[i] = (respuesta.status_code, respuesta.json)
+    
+    hilos = [threading.Thread(target=reservar, args=(i,)) for i in range(len(reservas))]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    
+    return respuestas
+
+
+def _reserva(fecha, hora, servicio_id, i):
+    return {
+        'fecha': fecha.isoformat(),
+        'hora': hora,
+        'servicio_id': servicio_id,
+        'nombre_cliente': f'Cliente {i}',
+        'telefono_cliente': '1100000000',
+        'client_id': f'cliente-{i}',
+    }
+
+
+def _preparar(app, max_turnos=None):
+    with app.app_context():
+        _configurar_negocio('09:00', '19:00', 30, max_turnos=max_turnos)
+        servicio = Servicio(nombre_servicio='Corte', categoria='Peluquería', precio=1000)
+        db.session.add(servicio)
+        db.session.commit()
+        return servicio.id
+
+
+# Muchos clientes reservando el mismo horario a la vez: uno solo lo consigue,
+# el resto recibe "ya está reservado" y el contador del día no queda inflado
+def test_reservas_simultaneas_del_mismo_horario(app):
+    fecha = _proximo_dia_habil()
+    servicio_id = _preparar(app)
+    
+    respuestas = _reservar_en_paralelo(app, [_reserva(fecha, '10:00', servicio_id, i) for i in range(8)])
+    
+    exitosas = [cuerpo for status, cuerpo in respuestas if status == 200]
+    rechazadas = [cuerpo for status, cuerpo in respuestas if status != 200]
+    assert len(exitosas) == 1
+    assert {(cuerpo['success'], cuerpo['mensaje']) for cuerpo in rechazadas} == {
+        (False, 'Ese horario ya está reservado. Elegí otro.')
+    }
+    
+    with app.app_context():
+        assert db.session.get(TurnosPorDia, fecha).reservados == 1
+        assert db.session.scalar(select(func.count()).select_from(Turno)) == 1
+
+
+# Con max_turnos, reservas simultáneas de horarios distintos no pasan el máximo del día
+def test_reservas_simultaneas_respetan_max_turnos(app):
+    fecha = _proximo_dia_habil()
+    servicio_id = _preparar(app, max_turnos=3)
+    horas = ['09:00', '09:30', '10:00', '10:30', '11:00', '11:30', '12:00', '12:30']
+    
+    respuestas = _reservar_en_paralelo(app, [_reserva(fecha, hora, servicio_id, i) for i, hora in enumerate(horas)])
+    
+    rechazadas = [cuerpo for status, cuerpo in respuestas if status != 200]
+    assert sum(status == 200 for status, _ in respuestas) == 3
+    assert {cuerpo['mensaje'] for cuerpo in rechazadas} == {'No quedan turnos para ese día. Elegí otra fecha.'}
+    
+    with app.app_context():
+        assert db.session.get(TurnosPorDia, fecha).reservados == 3
+        assert db.session.scalar(select(func.count()).select_from(Turno)) == 3
@@ -0,0 +1,5 @@
+from app import create_app
+
+# Punto de entrada WSGI para producción
+# gunicorn -c gunicorn.conf.py wsgi:app
+app = create_app()